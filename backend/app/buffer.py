@@ -0,0 +1,177 @@
+"""
+MedGuard — Write-behind buffer
+Collects high-volume event rows (brain_log, symptoms) in memory and writes
+them as multi-row INSERTs when either a size or a time threshold is reached,
+so logging an event never costs its own transaction.
+
+- put() applies backpressure: when the buffer is full, callers wait (up to a
+  timeout) for a flush to make room, then get BufferFull. A batch larger than
+  the whole buffer can never fit and gets BatchTooLarge right away.
+- start() / stop() run it from the app lifespan; stop() flushes whatever is
+  left. Buffers are module globals that can outlive an event loop (tests,
+  reloads), so their asyncio primitives are created on the loop using them.
+- A batch rejected because of its data (constraint / type errors) is split
+  in halves until the offending rows are isolated; only those are dropped.
+- Any other failed flush (database unreachable, ...) keeps its rows and is
+  retried with exponential backoff (up to MAX_BACKOFF seconds); meanwhile
+  the buffer fills up and put() pushes back. Only stop() gives up, after
+  SHUTDOWN_ATTEMPTS, logging the rows it couldn't write.
+"""
+
+import asyncio
+from typing import Callable
+
+from sqlalchemy.exc import DataError, IntegrityError
+from starlette.concurrency import run_in_threadpool
+
+MAX_BACKOFF = 30.0
+SHUTDOWN_ATTEMPTS = 3
+# Errors caused by the rows themselves — retrying the same rows can't help
+ROW_ERRORS = (IntegrityError, DataError)
+
+
+class BufferFull(Exception):
+    """Raised when the buffer stays full for longer than the put() timeout."""
+
+
+class BatchTooLarge(ValueError):
+    """Raised when a single put() holds more rows than the buffer ever can."""
+
+
+class WriteBehindBuffer:
+    def __init__(
+        self,
+        name: str,
+        write_batch: Callable[[list[dict]], None],
+        max_batch: int = 500,
+        flush_interval: float = 1.0,
+        max_pending: int = 10_000,
+    ):
+        self.name = name
+        self.write_batch = write_batch  # sync, runs in the threadpool
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._pending: list[dict] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._space: asyncio.Condition
+        self._flush_lock: asyncio.Lock
+        self._task: asyncio.Task | None = None
+        self._size_flushes: set[asyncio.Task] = set()
+        self._failures = 0
+        self._retry_at = 0.0  # loop time before which timed / size flushes wait
+
+    def __len__(self):
+        return len(self._pending)
+
+    def _bind(self):
+        """(Re)create the loop-bound primitives when used from a new event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._space = asyncio.Condition()
+            self._flush_lock = asyncio.Lock()
+            self._task = None
+            self._size_flushes = set()
+
+    async def put(self, rows: list[dict], timeout: float = 5.0):
+        if len(rows) > self.max_pending:
+            raise BatchTooLarge(f"{self.name}: batch of {len(rows)} rows exceeds the limit of {self.max_pending}")
+
+        self._bind()
+        async with self._space:
+            try:
+                await asyncio.wait_for(
+                    self._space.wait_for(lambda: len(self._pending) + len(rows) <= self.max_pending),
+                    timeout,
+                )
+            except asyncio.TimeoutError:
+                raise BufferFull(f"{self.name}: write buffer is full")
+            self._pending.extend(rows)
+
+        # Size threshold: flush now instead of waiting for the next tick
+        if len(self._pending) >= self.max_batch and not self._flush_lock.locked() and not self._backing_off():
+            task = asyncio.create_task(self.flush())
+            self._size_flushes.add(task)
+            task.add_done_callback(self._size_flushes.discard)
+
+    def _write_isolating(self, batch: list[dict]) -> tuple[int, Exception | None]:
+        """Write a batch, bisecting it on row errors. Parts are handled in order,
+        so the rows dealt with (written or rejected) are always a prefix of the
+        batch; returns its length and the error that stopped early, if any."""
+        done = 0
+        parts = [batch]
+        while parts:
+            part = parts.pop()
+            try:
+                self.write_batch(part)
+            except ROW_ERRORS as e:
+                if len(part) > 1:
+                    mid = len(part) // 2
+                    parts += [part[mid:], part[:mid]]
+                    continue
+                print(f"❌ {self.name}: dropping row that can't be written: {part[0]} ({e.orig or e})")
+            except Exception as e:
+                return done, e
+            done += len(part)
+        return done, None
+
+    async def flush(self):
+        """Write everything currently buffered, one multi-row INSERT per max_batch rows."""
+        self._bind()
+        async with self._flush_lock:
+            while self._pending:
+                batch = self._pending[:self.max_batch]
+                done, error = await run_in_threadpool(self._write_isolating, batch)
+                if error is not None:
+                    self._failures += 1
+                    delay = min(self.flush_interval * 2 ** self._failures, MAX_BACKOFF)
+                    self._retry_at = asyncio.get_running_loop().time() + delay
+                    print(f"⚠️ {self.name}: flush failed, retrying in {delay:.1f}s ({error})")
+                    await self._release(done)
+                    return
+                self._failures = 0
+                self._retry_at = 0.0
+                await self._release(done)
+
+    def _backing_off(self) -> bool:
+        return asyncio.get_running_loop().time() < self._retry_at
+
+    async def _release(self, count: int):
+        """Remove rows that were written (or rejected) and wake waiting put()s."""
+        if count:
+            del self._pending[:count]
+            async with self._space:
+                self._space.notify_all()
+
+    async def _run(self):
+        # Time threshold
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self._backing_off():
+                continue
+            # Shielded so cancelling the loop never abandons a half-written batch
+            await asyncio.shield(self.flush())
+
+    async def start(self):
+        self._bind()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for attempt in range(SHUTDOWN_ATTEMPTS):
+            if attempt:
+                await asyncio.sleep(self.flush_interval)
+            await self.flush()
+            if not self._pending:
+                break
+        else:
+            print(f"❌ {self.name}: {len(self._pending)} rows could not be written before shutdown")
@@ -3,14 +3,19 @@ MedGuard — Database connection (Neon PostgreSQL via SQLAlchemy)
 """
 
 import os
+import threading
+import time
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 # Load .env from the backend root (one level up from app/)
 load_dotenv(os.path.join(os.path.dirname(__file__), "..", ".env"))
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Optional read replica (e.g. a Neon read-only endpoint); reads use the primary when unset
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
 
 if not DATABASE_URL:
     raise RuntimeError(
@@ -18,19 +23,174 @@ if not DATABASE_URL:
         "Copy .env.example → .env and paste your Neon connection string."
     )
 
-if DATABASE_URL.startswith("postgres://"):
-    DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql+psycopg://", 1)
-elif DATABASE_URL.startswith("postgresql://"):
-    DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+psycopg://", 1)
+# Connections allowed per database server, shared by every worker process
+DB_CONNECTION_BUDGET = int(os.getenv("DB_CONNECTION_BUDGET", "20"))
+WORKERS = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+# After a commit, this client's reads go to the primary for this long (replica lag)
+READ_AFTER_WRITE_SECONDS = float(os.getenv("DB_READ_AFTER_WRITE_SECONDS", "5"))
+STICKY_COOKIE = "mg_primary_until"
+
+
+def _normalize_url(url: str) -> str:
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+psycopg://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+psycopg://", 1)
+    return url
+
+
+def pool_settings(budget: int = DB_CONNECTION_BUDGET, workers: int = WORKERS) -> dict:
+    """Split the connection budget across workers: two thirds kept open, the rest overflow."""
+    per_worker = max(2, budget // workers)
+    pool_size = max(1, per_worker * 2 // 3)
+    return {"pool_size": pool_size, "max_overflow": per_worker - pool_size}
+
+
+def _create_engine(url: str):
+    # In-memory SQLite uses a per-thread pool that takes no sizing arguments
+    sized = not (url.startswith("sqlite") and ":memory:" in url)
+    return create_engine(url, pool_pre_ping=True, **(pool_settings() if sized else {}))
+
+
+DATABASE_URL = _normalize_url(DATABASE_URL)
+
+# create_engine() is lazy — no connection is opened until the first query,
+# so importing this module never blocks on Neon.
+engine = _create_engine(DATABASE_URL)
+if DATABASE_REPLICA_URL:
+    DATABASE_REPLICA_URL = _normalize_url(DATABASE_REPLICA_URL)
+    read_engine = _create_engine(DATABASE_REPLICA_URL)
+else:
+    read_engine = engine
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 Base = declarative_base()
 
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+
+def init_db():
+    """Create missing tables once per process (idempotent, safe to call repeatedly)."""
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if _schema_ready:
+            return
+        # Import models so they are registered on Base.metadata
+        from app import models  # noqa: F401
+        Base.metadata.create_all(bind=engine)
+        _add_missing_columns()
+        _add_missing_indexes()
+        _backfill_rollups()
+        _schema_ready = True
+
+
+def _backfill_rollups():
+    """Existing databases get adherence_rollup empty — fill it from adherence_log
+    before incremental updates start adding deltas on top of nothing.
+
+    Best effort: a failed backfill is logged and retried on the next start,
+    it never keeps the schema from being marked ready."""
+    from sqlalchemy.exc import IntegrityError
+    from app.rollups import backfill_rollups
+    db = SessionLocal()
+    try:
+        count = backfill_rollups(db)
+        if count:
+            print(f"ℹ️ Backfilled {count} adherence rollup rows")
+    except IntegrityError:
+        # Another worker backfilled at the same time
+        db.rollback()
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️ Adherence rollup backfill failed: {e}")
+    finally:
+        db.close()
+
+
+def _add_missing_columns():
+    """create_all() never alters existing tables — add new nullable columns
+    (e.g. medicines.updated_at) so older databases keep working without reset_db."""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable or column.primary_key:
+                    continue
+                col_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}'))
+                print(f"ℹ️ Added column {table.name}.{column.name}")
+
+
+def _add_missing_indexes():
+    """create_all() only indexes the tables it creates — add indexes declared
+    since (e.g. idx_adherence_user_date) to tables that already existed."""
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {i["name"] for i in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            index.create(bind=engine, checkfirst=True)
+            print(f"ℹ️ Added index {index.name} on {table.name}")
+
+
+def warm_pool():
+    """Open (up to) pool_size connections on each engine so the first requests don't pay for TLS/auth."""
+    engines = [engine] if read_engine is engine else [engine, read_engine]
+    for eng in engines:
+        size = getattr(eng.pool, "size", lambda: 1)()
+        connections = []
+        try:
+            for _ in range(max(1, size)):
+                conn = eng.connect()
+                conn.execute(text("SELECT 1"))
+                connections.append(conn)
+        finally:
+            # Returning them to the pool keeps them open for reuse
+            for conn in connections:
+                conn.close()
+
+
+def read_session_factory(request: Request) -> sessionmaker:
+    """Replica sessions, unless this client committed a write within READ_AFTER_WRITE_SECONDS."""
+    try:
+        primary_until = float(request.cookies.get(STICKY_COOKIE, 0))
+    except ValueError:
+        primary_until = 0
+    return SessionLocal if primary_until > time.time() else ReadSessionLocal
+
 
-def get_db():
-    """FastAPI dependency — yields a DB session and closes it after the request."""
+def get_db(response: Response):
+    """FastAPI dependency — yields a primary (read-write) DB session and closes it after the request.
+    A successful commit pins the client's following reads to the primary for a short while."""
     db = SessionLocal()
+
+    @event.listens_for(db, "after_commit")
+    def _stick_to_primary(session):
+        if read_engine is not engine:
+            response.set_cookie(
+                STICKY_COOKIE, f"{time.time() + READ_AFTER_WRITE_SECONDS:.0f}",
+                max_age=max(1, int(READ_AFTER_WRITE_SECONDS)), httponly=True, samesite="lax",
+            )
+
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_db(request: Request):
+    """FastAPI dependency for read-only handlers — a replica session (see read_session_factory)."""
+    db = read_session_factory(request)()
     try:
         yield db
     finally:
@@ -0,0 +1,193 @@
+"""
+MedGuard — Drug name normalization index
+Maps OCR'd, misspelled or brand medicine names to canonical generics and
+classifies antibiotics deterministically (instead of trusting the model).
+
+The dictionary (generic, is_antibiotic, aliases) is loaded once per process
+into two compact structures:
+- a sorted array of normalized names searched with bisect — a flattened
+  prefix trie, used for exact hits and autocomplete;
+- a trigram → posting-list index (array('I')) for fuzzy matching.
+
+Fuzzy matches are suggestions only (autocomplete): similar names are often
+different drugs (clarithromycin / azithromycin, esomeprazole / omeprazole),
+so resolve() is exact unless asked otherwise.
+"""
+
+import csv
+import os
+import re
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from functools import lru_cache
+from typing import Iterable, NamedTuple, Optional
+
+DEFAULT_DICTIONARY = os.path.join(os.path.dirname(__file__), "data", "drugs.csv")
+
+# Minimum Dice similarity for a fuzzy match to count as the same drug
+MIN_SIMILARITY = 0.5
+# Candidates are gathered from the rarest query trigrams only: at most
+# CANDIDATE_TRIGRAMS lists, stopping early once POSTINGS_BUDGET ids are counted
+CANDIDATE_TRIGRAMS = 4
+POSTINGS_BUDGET = 4000
+MAX_CANDIDATES = 50
+
+# Dosage-form prefixes that OCR keeps in front of the name ("Tab. Dolo 650")
+_FORM_PREFIX = re.compile(r"^(tab|tabs|tablet|cap|caps|capsule|syp|syr|syrup|inj|injection|susp|drops?)\b\.?\s*")
+_PAREN = re.compile(r"\s*\(.*?\)\s*")
+_DOSE = re.compile(r"\d+(\.\d+)?\s*(mg|mcg|ml|g|iu|%)?\b")
+_NON_WORD = re.compile(r"[^a-z0-9\- ]+")
+_SPACES = re.compile(r"\s+")
+# Separators between the components of a combination product ("Pantoprazole + Domperidone")
+_COMBINATION = re.compile(r"\s*[+&/]\s*")
+
+
+def normalize(name: Optional[str]) -> str:
+    """Same idea as normalize() in drugInteractions.js, plus form prefixes."""
+    name = (name or "").lower().strip()
+    name = _PAREN.sub(" ", name)
+    name = _FORM_PREFIX.sub("", name)
+    name = _DOSE.sub(" ", name)
+    name = _NON_WORD.sub(" ", name)
+    return _SPACES.sub(" ", name).strip(" -")
+
+
+def split_combination(name: Optional[str]) -> list[str]:
+    """Component names of a combination product; a single-drug name gives one item."""
+    return [part for part in _COMBINATION.split(name or "") if normalize(part)]
+
+
+def _trigrams(term: str) -> set[str]:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class Drug(NamedTuple):
+    name: str  # canonical generic, lowercase
+    is_antibiotic: bool
+
+
+class Match(NamedTuple):
+    drug: Drug
+    matched: str  # the dictionary term (generic or alias) that matched
+    score: float  # 1.0 for exact hits
+
+
+class DrugIndex:
+    def __init__(self, entries: Iterable[tuple[str, bool, Iterable[str]]]):
+        self.drugs: list[Drug] = []
+        by_term: dict[str, int] = {}
+        for generic, is_antibiotic, aliases in entries:
+            drug_id = len(self.drugs)
+            self.drugs.append(Drug(normalize(generic), bool(is_antibiotic)))
+            for term in (generic, *aliases):
+                term = normalize(term)
+                if term:
+                    by_term.setdefault(term, drug_id)
+
+        self.terms: list[str] = sorted(by_term)
+        self.term_drug = array("I", (by_term[t] for t in self.terms))
+
+        postings: dict[str, list[int]] = {}
+        for term_id, term in enumerate(self.terms):
+            for gram in _trigrams(term):
+                postings.setdefault(gram, []).append(term_id)
+        self.trigrams = {gram: array("I", ids) for gram, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.terms)
+
+    def _exact(self, term: str) -> Optional[int]:
+        i = bisect_left(self.terms, term)
+        if i < len(self.terms) and self.terms[i] == term:
+            return i
+        return None
+
+    def _fuzzy(self, term: str, limit: int) -> list[tuple[float, int]]:
+        grams = _trigrams(term)
+        lists = sorted((self.trigrams[g] for g in grams if g in self.trigrams), key=len)
+        if not lists:
+            return []
+        hits = Counter(lists[0])
+        counted = len(lists[0])
+        for posting in lists[1:CANDIDATE_TRIGRAMS]:
+            if counted + len(posting) > POSTINGS_BUDGET:
+                break
+            hits.update(posting)
+            counted += len(posting)
+        scored = []
+        for term_id, _ in hits.most_common(MAX_CANDIDATES):
+            other = _trigrams(self.terms[term_id])
+            score = 2 * len(grams & other) / (len(grams) + len(other))
+            if score >= MIN_SIMILARITY:
+                scored.append((score, term_id))
+        scored.sort(key=lambda s: (-s[0], self.terms[s[1]]))
+        return scored[:limit]
+
+    def _match(self, term_id: int, score: float) -> Match:
+        return Match(self.drugs[self.term_drug[term_id]], self.terms[term_id], score)
+
+    def resolve(self, name: Optional[str], fuzzy: bool = False) -> Optional[Match]:
+        """Dictionary entry for a raw name (generic or alias), or None.
+        With fuzzy=True, falls back to the most similar term — a guess, never
+        safe to store as the patient's drug."""
+        term = normalize(name)
+        if not term:
+            return None
+        term_id = self._exact(term)
+        if term_id is not None:
+            return self._match(term_id, 1.0)
+        if not fuzzy:
+            return None
+        fuzzy = self._fuzzy(term, 1)
+        return self._match(fuzzy[0][1], fuzzy[0][0]) if fuzzy else None
+
+    def is_antibiotic(self, name: Optional[str]) -> bool:
+        match = self.resolve(name)
+        return bool(match and match.drug.is_antibiotic)
+
+    def suggest(self, query: Optional[str], limit: int = 10) -> list[Match]:
+        """Prefix matches first (alphabetical), then fuzzy matches; one entry per drug."""
+        term = normalize(query)
+        if not term:
+            return []
+        results: list[Match] = []
+        seen: set[int] = set()
+
+        def add(term_id: int, score: float):
+            drug_id = self.term_drug[term_id]
+            if drug_id not in seen:
+                seen.add(drug_id)
+                results.append(self._match(term_id, score))
+
+        i = bisect_left(self.terms, term)
+        while i < len(self.terms) and len(results) < limit and self.terms[i].startswith(term):
+            add(i, 1.0)
+            i += 1
+
+        if len(results) < limit:
+            for score, term_id in self._fuzzy(term, limit * 2):
+                if len(results) >= limit:
+                    break
+                add(term_id, score)
+        return results
+
+
+def load_dictionary(path: str) -> DrugIndex:
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = csv.DictReader(f)
+        return DrugIndex(
+            (
+                row["generic"],
+                row["is_antibiotic"].strip().lower() in ("true", "1", "yes"),
+                [a for a in (row.get("aliases") or "").split("|") if a],
+            )
+            for row in rows
+        )
+
+
+@lru_cache(maxsize=1)
+def get_drug_index() -> DrugIndex:
+    """Process-wide index, loaded on first use."""
+    return load_dictionary(os.getenv("DRUG_DICTIONARY_PATH", DEFAULT_DICTIONARY))
@@ -0,0 +1,81 @@
+"""
+MedGuard — Live update broker
+In-process fan-out of compact medicine/adherence diffs to stream subscribers.
+
+Route handlers are mostly sync (run in the threadpool), so publish() is
+thread-safe and hands delivery to the event loop. Each subscriber gets a
+bounded queue; a subscriber that falls behind has its backlog replaced by a
+single "resync" event instead of slowing everyone else down.
+"""
+
+import asyncio
+import json
+import os
+import threading
+from collections import defaultdict
+
+QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "100"))
+
+RESYNC = json.dumps({"type": "resync"})
+
+
+class Broker:
+    def __init__(self, queue_size: int = QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: dict[str, set[asyncio.Queue]] = defaultdict(set)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        """Register a subscriber; must be called from the event loop."""
+        self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers[user_id].add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers is None:
+                return
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[user_id]
+
+    def subscriber_count(self, user_id: str | None = None) -> int:
+        with self._lock:
+            if user_id is not None:
+                return len(self._subscribers.get(user_id, ()))
+            return sum(len(s) for s in self._subscribers.values())
+
+    def publish(self, user_id: str, event: dict):
+        """Send an event to every subscriber of user_id. Safe to call from any thread."""
+        # Cheap exit for the common case — nobody is watching this user
+        if user_id not in self._subscribers or self._loop is None:
+            return
+        # Serialize once, fan out the same string to every queue
+        payload = json.dumps(event, default=str)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._fan_out(user_id, payload)
+        else:
+            self._loop.call_soon_threadsafe(self._fan_out, user_id, payload)
+
+    def _fan_out(self, user_id: str, payload: str):
+        with self._lock:
+            queues = list(self._subscribers.get(user_id, ()))
+        for queue in queues:
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                # Slow consumer: drop its backlog and tell it to refetch
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+
+
+broker = Broker()
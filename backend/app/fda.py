@@ -0,0 +1,217 @@
+"""
+MedGuard — OpenFDA label lookups
+Serves drug label / interaction text from a local SQLite snapshot (built by
+build_fda_snapshot.py) behind a bounded in-memory LRU, so interaction checks
+never wait on api.fda.gov.
+
+With refresh on, labels that are missing or older than OPENFDA_MAX_AGE_DAYS
+are fetched from the public API in a background thread and written back to
+the snapshot; the current request still answers from whatever the snapshot
+has. OPENFDA_REFRESH=auto (default) turns it on until a bulk snapshot has
+been built; 1 / 0 force it.
+
+An empty snapshot is seeded from a small bundled fixture (marked stale, so
+refresh replaces it), so interaction checks never silently find nothing.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional
+
+DEFAULT_SNAPSHOT = os.path.join(os.path.dirname(__file__), "..", "data", "openfda.sqlite")
+FIXTURE = os.path.join(os.path.dirname(__file__), "data", "openfda_fixture.json")
+# Fewer labels than this means build_fda_snapshot.py has not been run (full dumps have tens of thousands)
+BULK_SNAPSHOT_MIN_LABELS = 1000
+UPSTREAM_URL = "https://api.fda.gov/drug/label.json"
+UPSTREAM_TIMEOUT = 8
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS labels (
+    generic_name TEXT PRIMARY KEY,
+    brand_names TEXT,
+    drug_interactions TEXT,
+    fetched_at REAL NOT NULL
+)
+"""
+
+_MISSING = object()  # cached "not in snapshot" marker
+
+
+def fetch_upstream_label(generic_name: str) -> Optional[dict]:
+    """One label from api.fda.gov, in snapshot row form (None if not found)."""
+    query = urllib.parse.urlencode({"search": f'openfda.generic_name:"{generic_name}"', "limit": 1})
+    try:
+        with urllib.request.urlopen(f"{UPSTREAM_URL}?{query}", timeout=UPSTREAM_TIMEOUT) as response:
+            data = json.load(response)
+    except urllib.error.HTTPError as e:
+        if e.code == 404:  # openFDA answers 404 for "no matches"
+            return None
+        raise
+    results = data.get("results") or []
+    if not results:
+        return None
+    return label_row(generic_name, results[0])
+
+
+def label_row(generic_name: str, label: dict) -> dict:
+    """Flatten an openFDA label document into the snapshot's columns."""
+    openfda = label.get("openfda") or {}
+    return {
+        "generic_name": generic_name.lower(),
+        "brand_names": "|".join(b.lower() for b in openfda.get("brand_name") or []),
+        "drug_interactions": (label.get("drug_interactions") or [None])[0],
+        "fetched_at": time.time(),
+    }
+
+
+class LabelStore:
+    def __init__(self, path: str, cache_size: int = 1024, refresh: Optional[bool] = False, max_age_days: float = 30):
+        """refresh=None: on while the snapshot has fewer than BULK_SNAPSHOT_MIN_LABELS labels."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute(SCHEMA)
+        self._db.commit()
+        self._db_lock = threading.Lock()
+        self.label_count = self._count()
+
+        self._cache: OrderedDict[str, object] = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_lock = threading.Lock()
+
+        if refresh is None:
+            refresh = self.label_count < BULK_SNAPSHOT_MIN_LABELS
+        self.refresh = refresh
+        self.max_age = max_age_days * 86400
+        self._refreshing: set[str] = set()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="openfda") if refresh else None
+
+    # ── LRU ──────────────────────────────────────────────
+    def _cache_get(self, name: str):
+        with self._cache_lock:
+            value = self._cache.get(name)
+            if value is not None:
+                self._cache.move_to_end(name)
+            return value
+
+    def _cache_put(self, name: str, value):
+        with self._cache_lock:
+            self._cache[name] = value
+            self._cache.move_to_end(name)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+    def _cache_drop(self, name: str):
+        with self._cache_lock:
+            self._cache.pop(name, None)
+
+    # ── Snapshot ─────────────────────────────────────────
+    def _count(self) -> int:
+        return self._db.execute("SELECT count(*) FROM labels").fetchone()[0]
+
+    def _read(self, name: str) -> Optional[dict]:
+        with self._db_lock:
+            row = self._db.execute("SELECT * FROM labels WHERE generic_name = ?", (name,)).fetchone()
+        return dict(row) if row else None
+
+    def upsert(self, rows: list[dict]):
+        with self._db_lock:
+            self._db.executemany(
+                "INSERT INTO labels (generic_name, brand_names, drug_interactions, fetched_at) "
+                "VALUES (:generic_name, :brand_names, :drug_interactions, :fetched_at) "
+                # Never replace known interaction text with an empty section
+                "ON CONFLICT(generic_name) DO UPDATE SET "
+                "brand_names = COALESCE(NULLIF(excluded.brand_names, ''), labels.brand_names), "
+                "drug_interactions = COALESCE(excluded.drug_interactions, labels.drug_interactions), "
+                "fetched_at = excluded.fetched_at",
+                rows,
+            )
+            self._db.commit()
+            self.label_count = self._count()
+        for row in rows:
+            self._cache_drop(row["generic_name"])
+
+    # ── Background refresh ───────────────────────────────
+    def _schedule_refresh(self, name: str):
+        with self._cache_lock:
+            if name in self._refreshing:
+                return
+            self._refreshing.add(name)
+        self._executor.submit(self._refresh, name)
+
+    def _refresh(self, name: str):
+        try:
+            row = fetch_upstream_label(name)
+            # Remember misses too, so we don't hit upstream for them again until stale
+            self.upsert([row or {"generic_name": name, "brand_names": "", "drug_interactions": None,
+                                 "fetched_at": time.time()}])
+        except Exception as e:
+            print(f"⚠️ OpenFDA refresh failed for {name}: {e}")
+        finally:
+            with self._cache_lock:
+                self._refreshing.discard(name)
+
+    # ── Public API ───────────────────────────────────────
+    def get(self, generic_name: str) -> Optional[dict]:
+        name = generic_name.strip().lower()
+        cached = self._cache_get(name)
+        if cached is None:
+            cached = self._read(name) or _MISSING
+            self._cache_put(name, cached)
+
+        label = None if cached is _MISSING else cached
+        if self.refresh and (label is None or time.time() - label["fetched_at"] > self.max_age):
+            self._schedule_refresh(name)
+        return label
+
+    def interaction_text(self, generic_name: str) -> Optional[str]:
+        label = self.get(generic_name)
+        return label["drug_interactions"] if label else None
+
+    def close(self):
+        if self._executor:
+            self._executor.shutdown(wait=False)
+        with self._db_lock:
+            self._db.close()
+
+
+def seed_fixture(store: LabelStore, path: str = FIXTURE) -> int:
+    """Load the bundled fixture labels, stamped fetched_at=0 so refresh treats them as stale."""
+    with open(path, encoding="utf-8") as f:
+        labels = json.load(f)["results"]
+    rows = [
+        {**label_row(generic, label), "fetched_at": 0}
+        for label in labels
+        for generic in label["openfda"]["generic_name"]
+    ]
+    store.upsert(rows)
+    return len(rows)
+
+
+@lru_cache(maxsize=1)
+def get_label_store() -> LabelStore:
+    """Process-wide store, opened on first use."""
+    refresh = os.getenv("OPENFDA_REFRESH", "auto")
+    store = LabelStore(
+        os.getenv("OPENFDA_SNAPSHOT_PATH", DEFAULT_SNAPSHOT),
+        cache_size=int(os.getenv("OPENFDA_CACHE_SIZE", "1024")),
+        refresh=None if refresh == "auto" else refresh == "1",
+        max_age_days=float(os.getenv("OPENFDA_MAX_AGE_DAYS", "30")),
+    )
+    if store.label_count == 0:
+        count = seed_fixture(store)
+        print(f"⚠️ OpenFDA snapshot is empty — seeded {count} fixture labels; run build_fda_snapshot.py "
+              f"for full coverage (background refresh {'on' if store.refresh else 'off'})")
+    elif store.label_count < BULK_SNAPSHOT_MIN_LABELS:
+        print(f"⚠️ OpenFDA snapshot has only {store.label_count} labels; run build_fda_snapshot.py "
+              f"for full coverage (background refresh {'on' if store.refresh else 'off'})")
+    return store
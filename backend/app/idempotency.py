@@ -0,0 +1,187 @@
+"""
+MedGuard — Idempotency-Key support for write endpoints
+Pure ASGI middleware (works for JSON and multipart uploads alike).
+
+For POSTs to IDEMPOTENT_PATHS carrying an Idempotency-Key header:
+- the first request runs normally and its response is stored;
+- a retry with the same key gets the stored response back
+  (Idempotent-Replayed: true) without running the handler again;
+- a duplicate arriving while the first is still running waits for it and
+  reuses its result;
+- reusing a key with a different body is rejected with 422 (multipart
+  bodies are compared with their random boundary masked out).
+
+Entries expire after IDEMPOTENCY_TTL_SECONDS and the store is capped at
+IDEMPOTENCY_MAX_KEYS (oldest evicted first). 5xx responses are not stored,
+so a failed request can be retried for real. The store is per process.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+
+IDEMPOTENT_PATHS = {
+    "/api/medicines",
+    "/api/profile",
+    "/api/prescriptions/upload",
+    "/api/prescriptions/upload/batch",
+}
+TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+# How long a duplicate waits for the in-flight original (OCR can be slow)
+WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "120"))
+
+_BOUNDARY = re.compile(rb'boundary="?([^";]+)"?', re.IGNORECASE)
+
+
+class _Entry:
+    __slots__ = ("fingerprint", "created", "done", "response")
+
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.created = time.monotonic()
+        self.done = asyncio.Event()
+        self.response = None  # (status, headers, body) once stored
+
+
+class IdempotencyStore:
+    def __init__(self, ttl: float = TTL_SECONDS, max_keys: int = MAX_KEYS):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()
+
+    def _evict(self):
+        now = time.monotonic()
+        # Insertion order == age order, so expired entries are at the front
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if now - entry.created <= self.ttl and len(self._entries) <= self.max_keys:
+                break
+            del self._entries[key]
+
+    def claim(self, key: tuple, fingerprint: str) -> tuple[_Entry, bool]:
+        """Return (entry, is_owner). The owner runs the request; others wait on entry.done."""
+        self._evict()
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry, False
+        entry = _Entry(fingerprint)
+        self._entries[key] = entry
+        return entry, True
+
+    def release(self, key: tuple, entry: _Entry, response):
+        """Finish an in-flight entry; drop it if there is nothing worth replaying."""
+        if response is None:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+        else:
+            entry.response = response
+        entry.done.set()
+
+
+def _fingerprint(content_type: bytes, body: bytes) -> str:
+    """Hash of the request body. Clients pick a new multipart boundary on every
+    send, so it is replaced by a fixed token: the same files and fields give the
+    same fingerprint."""
+    if content_type.lower().startswith(b"multipart/"):
+        match = _BOUNDARY.search(content_type)
+        if match:
+            body = body.replace(b"--" + match.group(1), b"--boundary")
+    return hashlib.sha256(body).hexdigest()
+
+
+async def _send_json(send, status: int, payload: dict):
+    body = json.dumps(payload).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+    def __init__(self, app, store: IdempotencyStore | None = None, paths=IDEMPOTENT_PATHS):
+        self.app = app
+        self.store = store or IdempotencyStore()
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        header = headers.get(b"idempotency-key")
+        if not header:
+            return await self.app(scope, receive, send)
+        if len(header) > 255:
+            return await _send_json(send, 400, {"detail": "Idempotency-Key is too long (max 255)"})
+
+        # Buffer the body: needed for the fingerprint, then replayed to the app
+        messages = []
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request" or not message.get("more_body"):
+                break
+        body = b"".join(m.get("body", b"") for m in messages if m["type"] == "http.request")
+        fingerprint = _fingerprint(headers.get(b"content-type", b""), body)
+        key = (scope["path"], header)
+
+        while True:
+            entry, owner = self.store.claim(key, fingerprint)
+            if entry.fingerprint != fingerprint:
+                return await _send_json(send, 422, {"detail": "Idempotency-Key was already used with a different request body"})
+            if owner:
+                return await self._run(scope, messages, receive, send, key, entry)
+            try:
+                await asyncio.wait_for(entry.done.wait(), WAIT_SECONDS)
+            except asyncio.TimeoutError:
+                return await _send_json(send, 409, {"detail": "A request with this Idempotency-Key is still in progress"})
+            if entry.response is not None:
+                return await self._replay(send, entry.response)
+            # The original failed and was dropped — try to become the owner
+
+    async def _run(self, scope, messages, receive, send, key, entry):
+        pending = list(messages)
+
+        async def replay_receive():
+            if pending:
+                return pending.pop(0)
+            return await receive()
+
+        status = None
+        headers = []
+        body = []
+
+        async def capture_send(message):
+            nonlocal status, headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = [(k, v) for k, v in message.get("headers", []) if k.lower() != b"content-length"]
+            elif message["type"] == "http.response.body":
+                body.append(message.get("body", b""))
+            await send(message)
+
+        response = None
+        try:
+            await self.app(scope, replay_receive, capture_send)
+            if status is not None and status < 500:
+                response = (status, headers, b"".join(body))
+        finally:
+            self.store.release(key, entry, response)
+
+    async def _replay(self, send, response):
+        status, headers, body = response
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": headers + [
+                (b"content-length", str(len(body)).encode()),
+                (b"idempotent-replayed", b"true"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -2,29 +2,71 @@
 MedGuard — FastAPI Application Entry Point
 """
 
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
-from app.database import engine, Base
+from app.database import init_db
+from app.idempotency import IdempotencyMiddleware
+from app.routes.health import router as health_router
 from app.routes.profile import router as profile_router
 from app.routes.prescription import router as prescription_router
 from app.routes.medicines import router as medicines_router
 from app.routes.adherence import router as adherence_router
 from app.routes.risk import router as risk_router
+from app.routes.stream import router as stream_router
+from app.routes.caregiver import router as caregiver_router
+from app.routes.brain import router as brain_router, buffers as event_buffers
+from app.routes.drugs import router as drugs_router
+from app.routes.fda import router as fda_router
+from app.routes.reports import router as reports_router
+
+
+async def _init_schema():
+    try:
+        await run_in_threadpool(init_db)
+    except Exception as e:
+        print(f"⚠️ Schema check deferred, database unavailable: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Check the schema in the background instead of at import time, so a slow
+    # or unavailable database never blocks boot. /api/ready retries it and
+    # reports 503 until it succeeds.
+    schema_task = asyncio.create_task(_init_schema())
+    for buffer in event_buffers:
+        await buffer.start()
+    yield
+    schema_task.cancel()
+    # Flush buffered brain_log / symptoms rows before the process exits
+    for buffer in event_buffers:
+        await buffer.stop()
 
-# Create all tables on startup (safe for demo — idempotent)
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="MedGuard API",
     description="Medication adherence monitoring backend for elderly users",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
-# CORS — allow everything for demo / local frontend
+# Idempotency-Key replay for retried writes (added before CORS so CORS stays
+# outermost and replayed responses get CORS headers too)
+app.add_middleware(IdempotencyMiddleware)
+
+# CORS — the frontend sends credentials (read-after-write cookie), which
+# browsers reject with a wildcard origin, so origins are listed explicitly:
+# CORS_ORIGINS (comma-separated), or any localhost port for local development.
+CORS_ORIGINS = [o.strip() for o in os.getenv("CORS_ORIGINS", "").split(",") if o.strip()]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=CORS_ORIGINS,
+    allow_origin_regex=None if CORS_ORIGINS else r"^https?://(localhost|127\.0\.0\.1)(:\d+)?$",
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -35,36 +77,25 @@ app.add_middleware(
 
 
 # ── Routers ──────────────────────────────────────────────
+app.include_router(health_router)
 app.include_router(profile_router)
 app.include_router(prescription_router)
 app.include_router(medicines_router)
 app.include_router(adherence_router)
 app.include_router(risk_router)
+app.include_router(stream_router)
+app.include_router(caregiver_router)
+app.include_router(brain_router)
+app.include_router(drugs_router)
+app.include_router(fda_router)
+app.include_router(reports_router)
 
 # ── Static Files (Frontend) ──────────────────────────────
 import os
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from app.static import mount_frontend
 
 # Check if frontend build exists (for local production/deployment)
 frontend_dist = os.path.join(os.path.dirname(os.path.dirname(__file__)), "..", "frontend", "dist")
 
 if os.path.exists(frontend_dist):
-    app.mount("/assets", StaticFiles(directory=os.path.join(frontend_dist, "assets")), name="assets")
-
-    @app.get("/")
-    async def serve_spa_root():
-        return FileResponse(os.path.join(frontend_dist, "index.html"))
-
-
-
-    # Catch-all for React Router (SPA)
-    @app.get("/{full_path:path}")
-    async def serve_react_app(full_path: str):
-        # API requests strictly separate
-        if full_path.startswith("api/"):
-            return {"error": "API route not found"}
-        
-        # Serve index.html for any other path
-        return FileResponse(os.path.join(frontend_dist, "index.html"))
-
+    mount_frontend(app, frontend_dist)
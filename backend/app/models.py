@@ -1,10 +1,10 @@
 """
 MedGuard — SQLAlchemy ORM Models
-Tables: profiles, medicines, adherence_log
+Tables: profiles, medicines, adherence_log, adherence_rollup, symptoms, brain_log, schema_migrations
 """
 
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -28,14 +28,16 @@ class Medicine(Base):
     __tablename__ = "medicines"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(String, ForeignKey("profiles.id"), nullable=False)
+    user_id = Column(String, ForeignKey("profiles.id"), nullable=False, index=True)
     name = Column(String, nullable=False)
+    generic_name = Column(String, nullable=True)  # dictionary generic(s) for the name, exact matches only
     dosage = Column(String, nullable=True)
     is_antibiotic = Column(Boolean, default=False)
     status = Column(String, default="pending")  # pending, taken, skipped
     urgent = Column(Boolean, default=False)
     times = Column(JSON, default=list)  # Store times as a JSON list ["08:00", "20:00"]
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
     owner = relationship("Profile", back_populates="medicines")
     # doses relationship removed as AdherenceLog is now a daily summary
@@ -43,6 +45,11 @@ class Medicine(Base):
 
 class AdherenceLog(Base):
     __tablename__ = "adherence_log"
+    __table_args__ = (
+        # Per-user range scans and "latest day" lookups; covers the dose counts
+        # so risk / caregiver overview aggregate from the index alone
+        Index("idx_adherence_user_date", "user_id", "date", "total_meds", "taken_meds"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("profiles.id"), nullable=False)
@@ -75,3 +82,60 @@ class AdherenceLog(Base):
     # But for this migration, let's match the Frontend's `adherence_log` expectation exactly.
     
     # Summary table, no direct link to single medicine
+
+
+class AdherenceRollup(Base):
+    """Weekly / monthly totals of adherence_log, kept in step by log_adherence
+    (and rebuildable with rebuild_rollups.py) so long-range charts read
+    ~60 rows for 5 years instead of ~1,800 daily ones."""
+    __tablename__ = "adherence_rollup"
+    __table_args__ = (
+        UniqueConstraint("user_id", "period", "period_start", name="uq_adherence_rollup_period"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(String, ForeignKey("profiles.id"), nullable=False)
+    period = Column(String, nullable=False)  # week (Monday start), month
+    period_start = Column(String, nullable=False)  # YYYY-MM-DD
+    days = Column(Integer, default=0)  # logged days in the period
+    all_taken_days = Column(Integer, default=0)
+    total_meds = Column(Integer, default=0)
+    taken_meds = Column(Integer, default=0)
+
+
+class Symptom(Base):
+    __tablename__ = "symptoms"
+    __table_args__ = (
+        UniqueConstraint("user_id", "symptom_id", name="uq_symptoms_user_symptom"),  # Prevent duplicates
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(String, ForeignKey("profiles.id"), nullable=False, index=True)
+    symptom_id = Column(String, nullable=False)  # e.g. 'rash', 'gastritis', 'fever_pers'
+    reported_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class BrainLog(Base):
+    __tablename__ = "brain_log"
+    __table_args__ = (
+        Index("idx_brain_log_user", "user_id", "created_at"),
+    )
+
+    # Records Brain decisions for history and doctor reports
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(String, ForeignKey("profiles.id"), nullable=False)
+    type = Column(String, nullable=False)  # alert, decision, insight
+    level = Column(String, default="green")  # red, yellow, green
+    title = Column(String, nullable=True)
+    message = Column(String, nullable=True)
+    data = Column(JSON, default=dict)  # Flexible payload for any extra info
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class SchemaMigration(Base):
+    """One-time data migrations already applied to this database (e.g. the
+    first adherence_rollup backfill), so init_db never has to guess from data."""
+    __tablename__ = "schema_migrations"
+
+    name = Column(String, primary_key=True)
+    applied_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
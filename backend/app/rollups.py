@@ -0,0 +1,152 @@
+"""
+MedGuard — Adherence rollups
+Keeps adherence_rollup (weekly / monthly sums of adherence_log) up to date.
+
+log_adherence calls apply_log_change() inside its own transaction with the
+before/after values of the daily row, so rollups move by exact deltas.
+rebuild_rollups() recomputes them from scratch (compaction / repair);
+init_db() runs it once per database (first deploy) and records that in
+schema_migrations.
+"""
+
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models import AdherenceLog, AdherenceRollup, SchemaMigration
+
+PERIODS = ("week", "month")
+REBUILD_BATCH = 5000
+BACKFILL_MIGRATION = "adherence_rollup_backfill"
+
+
+def period_start(day: str, period: str) -> str:
+    """First day of the week (Monday) or month containing day (YYYY-MM-DD)."""
+    d = date.fromisoformat(day)
+    if period == "week":
+        d -= timedelta(days=d.weekday())
+    else:
+        d = d.replace(day=1)
+    return d.isoformat()
+
+
+def _contribution(log: Optional[tuple[bool, int, int]]) -> tuple[int, int, int, int]:
+    """(days, all_taken_days, total_meds, taken_meds) one daily row adds to its periods."""
+    if log is None:
+        return 0, 0, 0, 0
+    all_taken, total, taken = log
+    return 1, int(bool(all_taken)), total or 0, taken or 0
+
+
+_COUNTS = ("days", "all_taken_days", "total_meds", "taken_meds")
+
+
+def _upsert(db: Session):
+    """Dialect INSERT supporting ON CONFLICT DO UPDATE, or None."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert(AdherenceRollup)
+
+
+def apply_log_change(db: Session, user_id: str, day: str,
+                     before: Optional[tuple[bool, int, int]], after: tuple[bool, int, int]):
+    """Add the difference between the old and new daily row to its week and month."""
+    old, new = _contribution(before), _contribution(after)
+    delta = [n - o for n, o in zip(new, old)]
+    if not any(delta):
+        return
+    d_days, d_all, d_total, d_taken = delta
+
+    for period in PERIODS:
+        start = period_start(day, period)
+        values = {
+            "user_id": user_id, "period": period, "period_start": start,
+            "days": d_days, "all_taken_days": d_all, "total_meds": d_total, "taken_meds": d_taken,
+        }
+        upsert = _upsert(db)
+        if upsert is not None:
+            # One statement: concurrent writers opening the same new period
+            # both land in the same row instead of racing on the unique key
+            stmt = upsert.values(**values)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=["user_id", "period", "period_start"],
+                set_={col: getattr(AdherenceRollup, col) + getattr(stmt.excluded, col) for col in _COUNTS},
+            ))
+            continue
+        # Other dialects: increment in SQL, insert the row on first use
+        result = db.execute(
+            update(AdherenceRollup)
+            .where(
+                AdherenceRollup.user_id == user_id,
+                AdherenceRollup.period == period,
+                AdherenceRollup.period_start == start,
+            )
+            .values({col: getattr(AdherenceRollup, col) + values[col] for col in _COUNTS})
+        )
+        if result.rowcount == 0:
+            db.add(AdherenceRollup(**values))
+
+
+def backfill_rollups(db: Session) -> int:
+    """Build rollups once for a database created before the rollup table existed.
+    Returns rows written, 0 if already done.
+
+    Rebuilds from scratch, so deltas written by requests that ran before the
+    backfill are replaced rather than mistaken for a complete table."""
+    if db.get(SchemaMigration, BACKFILL_MIGRATION) is not None:
+        return 0
+    count = rebuild_rollups(db, commit=False)
+    db.add(SchemaMigration(name=BACKFILL_MIGRATION))
+    db.commit()
+    return count
+
+
+def rebuild_rollups(db: Session, user_id: Optional[str] = None, commit: bool = True) -> int:
+    """Recompute rollups from adherence_log (all users, or one). Returns rows written.
+
+    Daily rows are streamed in date order; only the rollup totals are held in memory.
+    """
+    logs = select(
+        AdherenceLog.user_id, AdherenceLog.date, AdherenceLog.all_taken,
+        AdherenceLog.total_meds, AdherenceLog.taken_meds,
+    )
+    wipe = delete(AdherenceRollup)
+    if user_id is not None:
+        logs = logs.where(AdherenceLog.user_id == user_id)
+        wipe = wipe.where(AdherenceRollup.user_id == user_id)
+
+    totals: dict[tuple[str, str, str], list[int]] = {}
+    skipped = 0
+    for uid, day, all_taken, total, taken in db.execute(logs.execution_options(yield_per=REBUILD_BATCH)):
+        try:
+            starts = [(period, period_start(day, period)) for period in PERIODS]
+        except (TypeError, ValueError):
+            # Legacy rows with non-ISO dates can't be placed in a week/month
+            skipped += 1
+            continue
+        contribution = _contribution((all_taken, total, taken))
+        for period, start in starts:
+            acc = totals.setdefault((uid, period, start), [0, 0, 0, 0])
+            for i, value in enumerate(contribution):
+                acc[i] += value
+
+    db.execute(wipe)
+    rows = [
+        {"user_id": uid, "period": period, "period_start": start,
+         "days": v[0], "all_taken_days": v[1], "total_meds": v[2], "taken_meds": v[3]}
+        for (uid, period, start), v in totals.items()
+    ]
+    for i in range(0, len(rows), REBUILD_BATCH):
+        db.execute(insert(AdherenceRollup), rows[i:i + REBUILD_BATCH])
+    if commit:
+        db.commit()
+    if skipped:
+        print(f"⚠️ Skipped {skipped} adherence_log rows with unparseable dates")
+    return len(rows)
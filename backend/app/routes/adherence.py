@@ -1,20 +1,35 @@
 """
 MedGuard — Adherence Router
-POST /api/adherence  →  Log daily adherence summary
+POST /api/adherence_log               →  Log daily adherence summary
+GET /api/adherence/trend/{user_id}    →  Adherence per day / week / month over a date range
 """
 
-from fastapi import APIRouter, Depends
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.models import AdherenceLog
-from app.schemas import AdherenceLogCreate, AdherenceLogResponse
+from app.database import get_db, get_read_db
+from app.events import broker
+from app.models import AdherenceLog, AdherenceRollup
+from app.rollups import apply_log_change, period_start
+from app.schemas import AdherenceLogCreate, AdherenceLogResponse, AdherenceTrendPoint
 
 router = APIRouter(prefix="/api", tags=["Adherence"])
 
+# Auto granularity: keep charts around a few dozen to ~100 points
+MAX_DAILY_SPAN = 92
+MAX_WEEKLY_SPAN = 731
+
 
 @router.post("/adherence_log", response_model=AdherenceLogResponse)
 def log_adherence(data: AdherenceLogCreate, db: Session = Depends(get_db)):
+    try:
+        date.fromisoformat(data.date)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="date must be YYYY-MM-DD")
+
     # Check if a log exists for this user and date
     log = db.query(AdherenceLog).filter(
         AdherenceLog.user_id == data.user_id,
@@ -22,11 +37,13 @@ def log_adherence(data: AdherenceLogCreate, db: Session = Depends(get_db)):
     ).first()
     
     if log:
+        before = (log.all_taken, log.total_meds, log.taken_meds)
         # Update existing
         log.all_taken = data.all_taken
         log.total_meds = data.total_meds
         log.taken_meds = data.taken_meds
     else:
+        before = None
         # Create new
         log = AdherenceLog(
             user_id=data.user_id,
@@ -36,7 +53,79 @@ def log_adherence(data: AdherenceLogCreate, db: Session = Depends(get_db)):
             taken_meds=data.taken_meds
         )
         db.add(log)
-    
+
+    # Keep weekly / monthly rollups in the same transaction
+    apply_log_change(db, data.user_id, data.date, before, (data.all_taken, data.total_meds, data.taken_meds))
+
     db.commit()
     db.refresh(log)
+    broker.publish(log.user_id, {
+        "type": "adherence.logged",
+        "log": {
+            "date": log.date,
+            "all_taken": log.all_taken,
+            "total_meds": log.total_meds,
+            "taken_meds": log.taken_meds,
+        },
+    })
     return log
+
+
+def _point(granularity, start, days, all_taken_days, total, taken) -> dict:
+    return {
+        "granularity": granularity,
+        "period_start": start,
+        "days": days,
+        "all_taken_days": all_taken_days,
+        "total_meds": total,
+        "taken_meds": taken,
+        "rate": round(taken / total, 4) if total else None,
+    }
+
+
+@router.get("/adherence/trend/{user_id}", response_model=List[AdherenceTrendPoint])
+def get_adherence_trend(
+    user_id: str,
+    start: date,
+    end: date,
+    granularity: Optional[str] = Query(None, pattern="^(day|week|month)$"),
+    db: Session = Depends(get_read_db),
+):
+    if end < start:
+        raise HTTPException(status_code=422, detail="end must not be before start")
+
+    # Coarsest granularity that still gives a useful chart for the span
+    if granularity is None:
+        span = (end - start).days
+        granularity = "day" if span <= MAX_DAILY_SPAN else "week" if span <= MAX_WEEKLY_SPAN else "month"
+
+    if granularity == "day":
+        logs = (
+            db.query(AdherenceLog)
+            .filter(
+                AdherenceLog.user_id == user_id,
+                AdherenceLog.date >= start.isoformat(),
+                AdherenceLog.date <= end.isoformat(),
+            )
+            .order_by(AdherenceLog.date)
+            .all()
+        )
+        return [_point("day", l.date, 1, int(bool(l.all_taken)), l.total_meds, l.taken_meds) for l in logs]
+
+    # Buckets overlapping the range; edge buckets cover whole weeks / months
+    rollups = (
+        db.query(AdherenceRollup)
+        .filter(
+            AdherenceRollup.user_id == user_id,
+            AdherenceRollup.period == granularity,
+            AdherenceRollup.period_start >= period_start(start.isoformat(), granularity),
+            AdherenceRollup.period_start <= end.isoformat(),
+        )
+        .order_by(AdherenceRollup.period_start)
+        .all()
+    )
+    return [
+        _point(granularity, r.period_start, r.days, r.all_taken_days, r.total_meds, r.taken_meds)
+        for r in rollups
+        if r.days
+    ]
@@ -0,0 +1,143 @@
+"""
+MedGuard — Brain Router
+POST /api/brain_log                            →  Queue Brain alerts/decisions/insights
+GET /api/brain_log/{user_id}                   →  Recent Brain log entries
+POST /api/symptoms                             →  Queue reported symptoms
+GET /api/symptoms/{user_id}                    →  List reported symptoms
+DELETE /api/symptoms/{user_id}/{symptom_id}    →  Remove a symptom
+
+Writes go through a write-behind buffer and are answered with 202; reads
+flush the buffer first so a client always sees its own events.
+"""
+
+import os
+from datetime import datetime, timezone
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.buffer import BatchTooLarge, BufferFull, WriteBehindBuffer
+from app.database import SessionLocal, get_db
+from app.models import BrainLog, Symptom
+from app.schemas import (
+    BrainLogCreate, BrainLogResponse, SymptomCreate, SymptomResponse, QueuedResponse,
+)
+
+router = APIRouter(prefix="/api", tags=["Brain"])
+
+BUFFER_MAX_BATCH = int(os.getenv("EVENT_BUFFER_MAX_BATCH", "500"))
+BUFFER_FLUSH_SECONDS = float(os.getenv("EVENT_BUFFER_FLUSH_SECONDS", "1.0"))
+BUFFER_MAX_PENDING = int(os.getenv("EVENT_BUFFER_MAX_PENDING", "10000"))
+
+
+def _insert_ignoring_duplicates(db: Session, model):
+    """INSERT ... ON CONFLICT DO NOTHING for dialects that support it."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return insert(model)
+    return dialect_insert(model).on_conflict_do_nothing()
+
+
+def _write_brain_log(rows: list[dict]):
+    db = SessionLocal()
+    try:
+        # executemany → SQLAlchemy batches these into multi-row INSERTs
+        db.execute(insert(BrainLog), rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _write_symptoms(rows: list[dict]):
+    db = SessionLocal()
+    try:
+        db.execute(_insert_ignoring_duplicates(db, Symptom), rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _buffer(name, write_batch):
+    return WriteBehindBuffer(
+        name, write_batch,
+        max_batch=BUFFER_MAX_BATCH,
+        flush_interval=BUFFER_FLUSH_SECONDS,
+        max_pending=BUFFER_MAX_PENDING,
+    )
+
+
+brain_log_buffer = _buffer("brain_log", _write_brain_log)
+symptom_buffer = _buffer("symptoms", _write_symptoms)
+buffers = (brain_log_buffer, symptom_buffer)
+
+
+async def _enqueue(buffer: WriteBehindBuffer, rows: list[dict]) -> dict:
+    try:
+        await buffer.put(rows)
+    except BatchTooLarge as e:
+        # Retrying can't help — the client has to split the batch
+        raise HTTPException(status_code=413, detail=str(e))
+    except BufferFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    return {"queued": len(rows)}
+
+
+@router.post("/brain_log", response_model=QueuedResponse, status_code=202)
+async def log_brain_events(events: List[BrainLogCreate]):
+    now = datetime.now(timezone.utc)
+    rows = [
+        {**event.model_dump(exclude={"created_at"}), "created_at": event.created_at or now}
+        for event in events
+    ]
+    return await _enqueue(brain_log_buffer, rows)
+
+
+@router.get("/brain_log/{user_id}", response_model=List[BrainLogResponse])
+async def get_brain_log(user_id: str, limit: int = 50, db: Session = Depends(get_db)):
+    # Async so the flush can be awaited; the queries themselves run in the threadpool
+    await brain_log_buffer.flush()
+    return await run_in_threadpool(
+        lambda: db.query(BrainLog)
+        .filter(BrainLog.user_id == user_id)
+        .order_by(BrainLog.created_at.desc())
+        .limit(min(limit, 500))
+        .all()
+    )
+
+
+@router.post("/symptoms", response_model=QueuedResponse, status_code=202)
+async def report_symptoms(symptoms: List[SymptomCreate]):
+    now = datetime.now(timezone.utc)
+    rows = [
+        {"user_id": s.user_id, "symptom_id": s.symptom_id, "reported_at": s.reported_at or now}
+        for s in symptoms
+    ]
+    return await _enqueue(symptom_buffer, rows)
+
+
+@router.get("/symptoms/{user_id}", response_model=List[SymptomResponse])
+async def get_symptoms(user_id: str, db: Session = Depends(get_db)):
+    await symptom_buffer.flush()
+    return await run_in_threadpool(
+        lambda: db.query(Symptom).filter(Symptom.user_id == user_id).order_by(Symptom.reported_at).all()
+    )
+
+
+@router.delete("/symptoms/{user_id}/{symptom_id}")
+async def delete_symptom(user_id: str, symptom_id: str, db: Session = Depends(get_db)):
+    # A still-buffered insert would otherwise resurrect the symptom
+    await symptom_buffer.flush()
+
+    def delete():
+        db.query(Symptom).filter(Symptom.user_id == user_id, Symptom.symptom_id == symptom_id).delete()
+        db.commit()
+
+    await run_in_threadpool(delete)
+    return {"message": "Symptom deleted successfully"}
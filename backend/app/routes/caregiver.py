@@ -0,0 +1,108 @@
+"""
+MedGuard — Caregiver Router
+POST /api/caregiver/overview  →  Status, latest adherence and risk for many patients at once
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session, aliased
+
+from app.database import get_read_db
+from app.models import Profile, Medicine, AdherenceLog, AdherenceRollup
+from app.routes.risk import classify_risk
+from app.schemas import CaregiverOverviewRequest, PatientOverview
+
+router = APIRouter(prefix="/api", tags=["Caregiver"])
+
+MAX_PATIENTS = 1000
+
+
+def _count_status(status: str):
+    return func.coalesce(func.sum(case((Medicine.status == status, 1), else_=0)), 0)
+
+
+@router.post("/caregiver/overview", response_model=list[PatientOverview])
+def caregiver_overview(data: CaregiverOverviewRequest, db: Session = Depends(get_read_db)):
+    ids = list(dict.fromkeys(data.profile_ids))
+    if len(ids) > MAX_PATIENTS:
+        raise HTTPException(status_code=400, detail=f"Too many profiles (max {MAX_PATIENTS}).")
+    if not ids:
+        return []
+
+    # Per-patient medicine status counts
+    meds = (
+        select(
+            Medicine.user_id,
+            _count_status("pending").label("pending"),
+            _count_status("taken").label("taken"),
+            _count_status("skipped").label("skipped"),
+        )
+        .where(Medicine.user_id.in_(ids))
+        .group_by(Medicine.user_id)
+        .subquery()
+    )
+
+    # Per-patient missed doses (for risk), summed from the monthly rollups:
+    # ~12 rows per patient-year instead of every daily log
+    missed = (
+        select(
+            AdherenceRollup.user_id,
+            func.coalesce(func.sum(AdherenceRollup.total_meds - AdherenceRollup.taken_meds), 0).label("missed"),
+        )
+        .where(AdherenceRollup.user_id.in_(ids), AdherenceRollup.period == "month")
+        .group_by(AdherenceRollup.user_id)
+        .subquery()
+    )
+    # Most recent logged day: a single index seek on (user_id, date) per patient.
+    # Picks one row id so duplicate rows for the same day can't duplicate the patient.
+    latest_id = (
+        select(AdherenceLog.id)
+        .where(AdherenceLog.user_id == Profile.id)
+        .order_by(AdherenceLog.date.desc(), AdherenceLog.id.desc())
+        .limit(1)
+        .correlate(Profile)
+        .scalar_subquery()
+    )
+    latest = aliased(AdherenceLog)
+
+    # One round trip for every patient
+    rows = db.execute(
+        select(
+            Profile.id,
+            Profile.full_name,
+            Profile.is_senior,
+            meds.c.pending,
+            meds.c.taken,
+            meds.c.skipped,
+            missed.c.missed,
+            latest.date,
+            latest.all_taken,
+            latest.total_meds,
+            latest.taken_meds,
+        )
+        .outerjoin(meds, meds.c.user_id == Profile.id)
+        .outerjoin(missed, missed.c.user_id == Profile.id)
+        .outerjoin(latest, latest.id == latest_id)
+        .where(Profile.id.in_(ids))
+    ).all()
+
+    overview = []
+    for row in rows:
+        missed_doses = row.missed or 0
+        overview.append({
+            "user_id": row.id,
+            "full_name": row.full_name,
+            "is_senior": bool(row.is_senior),
+            "pending": row.pending or 0,
+            "taken": row.taken or 0,
+            "skipped": row.skipped or 0,
+            "latest_adherence": None if row.date is None else {
+                "date": row.date,
+                "all_taken": row.all_taken,
+                "total_meds": row.total_meds,
+                "taken_meds": row.taken_meds,
+            },
+            "missed_doses": missed_doses,
+            "risk_level": classify_risk(missed_doses),
+        })
+    return overview
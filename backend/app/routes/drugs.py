@@ -0,0 +1,34 @@
+"""
+MedGuard — Drugs Router
+GET /api/drugs/suggest?q=   →  Autocomplete medicine names
+GET /api/drugs/resolve?name= →  Canonical generic + antibiotic flag for a known generic/brand name
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.drugs import get_drug_index
+from app.schemas import DrugMatch
+
+router = APIRouter(prefix="/api", tags=["Drugs"])
+
+
+def _to_response(match) -> dict:
+    return {
+        "name": match.drug.name,
+        "is_antibiotic": match.drug.is_antibiotic,
+        "matched": match.matched,
+        "score": round(match.score, 3),
+    }
+
+
+@router.get("/drugs/suggest", response_model=list[DrugMatch])
+def suggest_drugs(q: str = Query(..., min_length=1), limit: int = Query(10, ge=1, le=50)):
+    return [_to_response(m) for m in get_drug_index().suggest(q, limit)]
+
+
+@router.get("/drugs/resolve", response_model=DrugMatch)
+def resolve_drug(name: str = Query(..., min_length=1)):
+    match = get_drug_index().resolve(name)
+    if not match:
+        raise HTTPException(status_code=404, detail="No matching drug found")
+    return _to_response(match)
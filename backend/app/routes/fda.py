@@ -0,0 +1,61 @@
+"""
+MedGuard — OpenFDA Router
+GET /api/fda/label/{name}      →  Label data from the local snapshot
+POST /api/fda/interactions     →  Pairs flagged by each drug's label interaction text
+"""
+
+from fastapi import APIRouter, HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from app.drugs import get_drug_index, normalize
+from app.fda import get_label_store
+from app.schemas import FdaInteraction, FdaInteractionRequest, FdaLabelResponse
+
+router = APIRouter(prefix="/api", tags=["OpenFDA"])
+
+
+def _generic(name: str) -> str:
+    """Brand → canonical generic when the drug dictionary knows the exact name."""
+    match = get_drug_index().resolve(name)
+    return match.drug.name if match else normalize(name)
+
+
+@router.get("/fda/label/{name}", response_model=FdaLabelResponse)
+def get_label(name: str):
+    label = get_label_store().get(_generic(name))
+    # Refreshed-but-unknown names are stored as empty rows
+    if not label or not (label["drug_interactions"] or label["brand_names"]):
+        raise HTTPException(status_code=404, detail="Label not in snapshot")
+    return label
+
+
+def _find_interactions(names: list[str]) -> list[dict]:
+    # First use opens the SQLite snapshot (and may seed it) — keep this off the event loop
+    store = get_label_store()
+    if store.label_count == 0:
+        raise HTTPException(status_code=503, detail="OpenFDA snapshot is empty")
+    generics = [_generic(n) for n in names]
+    flags = []
+    seen = set()
+    for i, generic in enumerate(generics):
+        text = store.interaction_text(generic) if generic else None
+        if not text:
+            continue
+        text = text.lower()
+        for j, other in enumerate(generics):
+            pair = tuple(sorted((generic, other)))
+            if i == j or not other or other == generic or pair in seen:
+                continue
+            # Same rule as the browser check: the other drug is named in this label
+            if other in text:
+                seen.add(pair)
+                flags.append({"a": i, "b": j, "drug_a": names[i], "drug_b": names[j]})
+    return flags
+
+
+@router.post("/fda/interactions", response_model=list[FdaInteraction])
+async def check_interactions(data: FdaInteractionRequest):
+    if get_label_store().label_count == 0:
+        # "No interactions" would be a false all-clear
+        raise HTTPException(status_code=503, detail="OpenFDA snapshot is empty")
+    return await run_in_threadpool(_find_interactions, data.names)
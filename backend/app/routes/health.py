@@ -0,0 +1,27 @@
+"""
+MedGuard — Health Router
+GET /api/health  →  Liveness (never touches the database)
+GET /api/ready   →  Readiness (ensures schema, warms the primary and replica pools)
+"""
+
+from fastapi import APIRouter, HTTPException
+
+from app.database import init_db, warm_pool
+
+router = APIRouter(prefix="/api", tags=["Health"])
+
+
+@router.get("/health")
+def health():
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+def ready():
+    try:
+        init_db()
+        warm_pool()
+    except Exception as e:
+        print(f"❌ Readiness check failed: {e}")
+        raise HTTPException(status_code=503, detail="Database not ready")
+    return {"status": "ready"}
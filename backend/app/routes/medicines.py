@@ -10,7 +10,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.database import get_db
+from app.database import get_db, get_read_db
+from app.events import broker
 from app.models import Medicine
 from app.schemas import MedicineResponse, MedicineCreate, MedicineUpdate
 
@@ -18,7 +19,7 @@ router = APIRouter(prefix="/api", tags=["Medicines"])
 
 
 @router.get("/medicines/{user_id}", response_model=List[MedicineResponse])
-def get_medicines(user_id: str, db: Session = Depends(get_db)):
+def get_medicines(user_id: str, db: Session = Depends(get_read_db)):
     medicines = db.query(Medicine).filter(Medicine.user_id == user_id).all()
     return medicines
 
@@ -37,6 +38,10 @@ def create_medicine(data: MedicineCreate, db: Session = Depends(get_db)):
     db.add(medicine)
     db.commit()
     db.refresh(medicine)
+    broker.publish(medicine.user_id, {
+        "type": "medicine.created",
+        "medicine": MedicineResponse.model_validate(medicine).model_dump(mode="json"),
+    })
     return medicine
 
 
@@ -53,6 +58,8 @@ def update_medicine(medicine_id: int, data: MedicineUpdate, db: Session = Depend
     
     db.commit()
     db.refresh(medicine)
+    # Only the changed fields go over the wire
+    broker.publish(medicine.user_id, {"type": "medicine.updated", "id": medicine.id, "changes": update_data})
     return medicine
 
 
@@ -62,6 +69,8 @@ def delete_medicine(medicine_id: int, db: Session = Depends(get_db)):
     if not medicine:
         raise HTTPException(status_code=404, detail="Medicine not found")
     
+    user_id = medicine.user_id
     db.delete(medicine)
     db.commit()
+    broker.publish(user_id, {"type": "medicine.deleted", "id": medicine_id})
     return {"message": "Medicine deleted successfully"}
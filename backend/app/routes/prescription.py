@@ -1,36 +1,181 @@
 """
 MedGuard — Prescription Router
-POST /api/prescriptions/upload  →  Mock-extract medicines from uploaded file
+POST /api/prescriptions/upload        →  Extract medicines from one uploaded file
+POST /api/prescriptions/upload/batch  →  Extract medicines from several pages/images at once
 """
 
+import asyncio
+import re
+from typing import List
+
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.database import get_db
+from app.drugs import get_drug_index, split_combination
+from app.events import broker
 from app.models import Profile, Medicine
 from app.schemas import MedicineResponse
 import os
 import json
 import base64
-from dotenv import load_dotenv
-from openai import OpenAI
-
-load_dotenv()
 
 router = APIRouter(prefix="/api", tags=["Prescriptions"])
 
+# Upper bound on simultaneous OCR calls for one batch upload
+OCR_MAX_CONCURRENCY = int(os.getenv("OCR_MAX_CONCURRENCY", "4"))
+# Prescriptions rarely exceed a few pages plus the pharmacy bill
+MAX_BATCH_FILES = int(os.getenv("MAX_BATCH_FILES", "10"))
 
-@router.post("/prescriptions/upload", response_model=list[MedicineResponse])
-async def upload_prescription(file: UploadFile = File(...), db: Session = Depends(get_db)):
+SYSTEM_PROMPT = """
+        You are a medical assistant OCR. Analyze the prescription image and extract medicines.
+        Return ONLY a raw JSON array (no markdown, no ```json wrapper).
+        Format: [{"name": "Medicine Name", "dosage": "500mg", "frequency": "Twice Daily", "is_antibiotic": boolean}]
+        Rules:
+        - Extract exact names.
+        - Guess antibiotic status based on name (set is_antibiotic: true/false).
+        - If text is illegible, return []
+        """
+
+
+def _demo_extract(filename: str) -> list[dict]:
+    """Fallback used when OPENAI_API_KEY is missing (demo safety net)."""
+    if "demo1" in (filename or "").lower():
+        return [{"name": "Amoxicillin", "is_antibiotic": True}, {"name": "Paracetamol", "is_antibiotic": False}]
+    return [{"name": "Paracetamol", "is_antibiotic": False}, {"name": "Ibuprofen", "is_antibiotic": False}]
+
+
+def _get_client(api_key: str):
+    # Imported lazily: the openai SDK is slow to import and only needed for uploads
+    from openai import OpenAI
+    return OpenAI(api_key=api_key)
+
+
+def _call_vision_model(client, contents: bytes, mime_type: str) -> list[dict]:
+    """Blocking OpenAI call — run it in a worker thread, never on the event loop."""
+    base64_image = base64.b64encode(contents).decode("utf-8")
+
+    response = client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": SYSTEM_PROMPT},
+                    {
+                        "type": "image_url",
+                        "image_url": {"url": f"data:{mime_type};base64,{base64_image}"},
+                    },
+                ],
+            }
+        ],
+        max_tokens=1000,
+    )
+
+    content = response.choices[0].message.content.strip()
+    # Clean potential markdown
+    if content.startswith("```json"):
+        content = content[7:]
+    if content.endswith("```"):
+        content = content[:-3]
+
+    return json.loads(content)
+
+
+def _canonicalize(med: dict) -> dict:
+    """Attach the canonical generic(s) next to the OCR name and set is_antibiotic
+    from the dictionary rather than the model's guess.
+
+    Only exact generic/alias hits count: a near-miss spelling is often another
+    drug. Combination products keep every component ("pantoprazole + domperidone");
+    if any component is unknown the medicine passes through unchanged.
+    """
+    index = get_drug_index()
+    parts = split_combination(med.get("name"))
+    matches = [index.resolve(part) for part in parts]
+    if not matches or not all(matches):
+        return med
+    return {
+        **med,
+        "generic_name": " + ".join(m.drug.name for m in matches),
+        "is_antibiotic": any(m.drug.is_antibiotic for m in matches),
+    }
+
+
+def _normalize(value: str | None) -> str:
+    """Lowercase, drop punctuation and whitespace so '500 mg' == '500mg'."""
+    return re.sub(r"[^a-z0-9]", "", (value or "").lower())
+
+
+def _merge_extracted(pages: list[list[dict]]) -> list[dict]:
+    """Merge per-page results, deduplicating by normalized name + dosage.
+
+    The first occurrence wins; later pages only fill in missing fields, and a
+    medicine flagged as an antibiotic on any page stays flagged.
+    """
+    merged: dict[tuple[str, str], dict] = {}
+    for page in pages:
+        for med in page:
+            name = _normalize(med.get("name"))
+            if not name:
+                continue
+            key = (name, _normalize(med.get("dosage")))
+            if key not in merged:
+                merged[key] = dict(med)
+                continue
+            existing = merged[key]
+            for field in ("dosage", "frequency"):
+                if not existing.get(field) and med.get(field):
+                    existing[field] = med[field]
+            existing["is_antibiotic"] = bool(existing.get("is_antibiotic") or med.get("is_antibiotic"))
+    return list(merged.values())
+
+
+def _build_medicine(user_id: str, med: dict) -> Medicine:
+    # Default times if not provided
+    times = ["08:00", "20:00"] if "Twice" in (med.get("frequency") or "") else ["08:00"]
+
+    return Medicine(
+        user_id=user_id,
+        name=med.get("name", "Unknown"),
+        generic_name=med.get("generic_name"),
+        dosage=med.get("dosage", ""),
+        is_antibiotic=med.get("is_antibiotic", False),
+        times=times,
+        status="pending"
+    )
+
+
+def _save_medicines(db: Session, user_id: str, extracted: list[dict]) -> list[Medicine]:
+    """Persist all extracted medicines in a single transaction."""
+    medicines = [_build_medicine(user_id, med) for med in extracted]
+    db.add_all(medicines)
+    db.commit()
+    for m in medicines:
+        db.refresh(m)
+        broker.publish(user_id, {
+            "type": "medicine.created",
+            "medicine": MedicineResponse.model_validate(m).model_dump(mode="json"),
+        })
+    return medicines
+
+
+def _latest_profile(db: Session) -> Profile:
     # Get the latest profile (highest id)
     profile = db.query(Profile).order_by(Profile.id.desc()).first()
     if not profile:
         raise HTTPException(status_code=404, detail="No profile found. Create a profile first.")
+    return profile
+
 
-    # 1. Read file and convert to base64
+@router.post("/prescriptions/upload", response_model=list[MedicineResponse])
+async def upload_prescription(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    profile = await run_in_threadpool(_latest_profile, db)
+
+    # 1. Read file
     try:
         contents = await file.read()
-        base64_image = base64.b64encode(contents).decode("utf-8")
         mime_type = file.content_type or "image/jpeg"
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to read file: {str(e)}")
@@ -39,75 +184,62 @@ async def upload_prescription(file: UploadFile = File(...), db: Session = Depend
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         print("❌ OPENAI_API_KEY is missing in .env")
-        # Fallback to demo mode if key is missing (safety net)
-        filename = (file.filename or "").lower()
-        if "demo1" in filename:
-            return [{"name": "Amoxicillin", "is_antibiotic": True}, {"name": "Paracetamol", "is_antibiotic": False}]
-        else:
-            return [{"name": "Paracetamol", "is_antibiotic": False}, {"name": "Ibuprofen", "is_antibiotic": False}]
+        # Demo mode: saved like real results, same as the batch upload
+        demo = [_canonicalize(med) for med in _demo_extract(file.filename)]
+        return await run_in_threadpool(_save_medicines, db, profile.id, demo)
 
     try:
-        client = OpenAI(api_key=api_key)
-        
-        system_prompt = """
-        You are a medical assistant OCR. Analyze the prescription image and extract medicines.
-        Return ONLY a raw JSON array (no markdown, no ```json wrapper).
-        Format: [{"name": "Medicine Name", "dosage": "500mg", "frequency": "Twice Daily", "is_antibiotic": boolean}]
-        Rules:
-        - Extract exact names.
-        - Guess antibiotic status based on name (set is_antibiotic: true/false).
-        - If text is illegible, return []
-        """
-
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": system_prompt},
-                        {
-                            "type": "image_url",
-                            "image_url": {"url": f"data:{mime_type};base64,{base64_image}"},
-                        },
-                    ],
-                }
-            ],
-            max_tokens=1000,
-        )
-
-        content = response.choices[0].message.content.strip()
-        # Clean potential markdown
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.endswith("```"):
-            content = content[:-3]
-        
-        extracted = json.loads(content)
-
+        client = _get_client(api_key)
+        extracted = await asyncio.to_thread(_call_vision_model, client, contents, mime_type)
     except Exception as e:
         print(f"❌ OpenAI Error: {e}")
         raise HTTPException(status_code=500, detail=f"AI Analysis Failed: {str(e)}")
 
-    # 3. Save to DB
-    medicines = []
-    for med in extracted:
-        # Default times if not provided
-        times = ["08:00", "20:00"] if "Twice" in (med.get("frequency") or "") else ["08:00"]
-        
-        m = Medicine(
-            user_id=profile.id,
-            name=med.get("name", "Unknown"),
-            dosage=med.get("dosage", ""),
-            is_antibiotic=med.get("is_antibiotic", False),
-            times=times,
-            status="pending"
-        )
-        db.add(m)
-        medicines.append(m)
+    # 3. Save to DB (off the event loop, like the OCR call)
+    canonical = [_canonicalize(med) for med in extracted]
+    return await run_in_threadpool(_save_medicines, db, profile.id, canonical)
 
-    db.commit()
-    for m in medicines:
-        db.refresh(m)
 
-    return medicines
+@router.post("/prescriptions/upload/batch", response_model=list[MedicineResponse])
+async def upload_prescription_batch(files: List[UploadFile] = File(...), db: Session = Depends(get_db)):
+    if not files:
+        raise HTTPException(status_code=400, detail="No files uploaded.")
+    if len(files) > MAX_BATCH_FILES:
+        raise HTTPException(status_code=400, detail=f"Too many files (max {MAX_BATCH_FILES}).")
+
+    profile = await run_in_threadpool(_latest_profile, db)
+
+    # 1. Read all files
+    pages = []
+    for file in files:
+        try:
+            pages.append((file.filename, await file.read(), file.content_type or "image/jpeg"))
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Failed to read file {file.filename}: {str(e)}")
+
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        print("❌ OPENAI_API_KEY is missing in .env")
+        # Demo mode: save the sample medicines like real results, so the
+        # response is the same list[MedicineResponse] shape
+        demo = [[_canonicalize(med) for med in _demo_extract(filename)] for filename, _, _ in pages]
+        return await run_in_threadpool(_save_medicines, db, profile.id, _merge_extracted(demo))
+
+    # 2. OCR every page concurrently — total latency ≈ slowest page, not the sum
+    client = _get_client(api_key)
+    semaphore = asyncio.Semaphore(OCR_MAX_CONCURRENCY)
+
+    async def extract(filename: str, contents: bytes, mime_type: str) -> list[dict]:
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(_call_vision_model, client, contents, mime_type)
+            except Exception as e:
+                print(f"❌ OpenAI Error ({filename}): {e}")
+                raise HTTPException(status_code=500, detail=f"AI Analysis Failed for {filename}: {str(e)}")
+
+    results = await asyncio.gather(*(extract(*page) for page in pages))
+
+    # 3. Attach dictionary generics, merge duplicates across pages
+    #    and save everything in one transaction
+    canonical = [[_canonicalize(med) for med in page] for page in results]
+    return await run_in_threadpool(_save_medicines, db, profile.id, _merge_extracted(canonical))
@@ -7,7 +7,7 @@ GET /api/profiles/{id} → Get profile data
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models import Profile
 from app.schemas import ProfileCreate, ProfileResponse
 
@@ -15,7 +15,7 @@ router = APIRouter(prefix="/api", tags=["Profile"])
 
 
 @router.get("/profiles/{user_id}", response_model=ProfileResponse)
-def get_profile(user_id: str, db: Session = Depends(get_db)):
+def get_profile(user_id: str, db: Session = Depends(get_read_db)):
     profile = db.query(Profile).filter(Profile.id == user_id).first()
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
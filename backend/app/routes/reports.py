@@ -0,0 +1,168 @@
+"""
+MedGuard — Reports Router
+GET /api/reports/{user_id}.csv  →  Doctor report (profile, risk, medicines, symptoms, full adherence history)
+
+The report is streamed row by row from server-side cursors, so memory stays
+flat however long the adherence history is. Each finished report is kept on
+disk, keyed by a fingerprint of the patient's data (last-modified times and
+row counts); repeat downloads are served from that file, or answered with
+304 when the client already has it.
+"""
+
+import csv
+import glob
+import hashlib
+import io
+import os
+import tempfile
+from datetime import datetime, timezone
+from email.utils import format_datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.database import get_read_db, read_session_factory
+from app.models import Profile, Medicine, AdherenceLog, Symptom
+from app.routes.risk import classify_risk, missed_doses_expr
+
+router = APIRouter(prefix="/api", tags=["Reports"])
+
+REPORT_CACHE_DIR = os.getenv("REPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "medguard-reports"))
+# Rows fetched per round trip from the server-side cursor
+CURSOR_BATCH = 1000
+# Rows buffered before a chunk is sent to the client
+CHUNK_ROWS = 500
+
+
+def _fingerprint(db: Session, profile: Profile) -> tuple[str, datetime]:
+    """ETag + Last-Modified for everything that goes into the report, in one query."""
+    def stats(count_col, stamp_col, user_col):
+        where = user_col == profile.id
+        return (
+            select(func.count(count_col)).where(where).scalar_subquery(),
+            select(func.max(stamp_col)).where(where).scalar_subquery(),
+        )
+
+    row = db.execute(
+        select(
+            *stats(Medicine.id, Medicine.updated_at, Medicine.user_id),
+            *stats(AdherenceLog.id, AdherenceLog.updated_at, AdherenceLog.user_id),
+            *stats(Symptom.id, Symptom.reported_at, Symptom.user_id),
+        )
+    ).one()
+
+    profile_state = (profile.id, profile.full_name, profile.age, profile.gender, profile.is_senior)
+    etag = hashlib.sha1(repr((profile_state, tuple(row))).encode()).hexdigest()
+
+    stamps = [t for t in (profile.created_at, row[1], row[3], row[5]) if t is not None]
+    last_modified = max(t if t.tzinfo else t.replace(tzinfo=timezone.utc) for t in stamps)
+    return etag, last_modified
+
+
+def _cache_path(user_id: str, etag: str) -> str:
+    # Hash the user id too — it comes from the URL and must not shape a file path
+    user_key = hashlib.sha1(user_id.encode()).hexdigest()[:16]
+    return os.path.join(REPORT_CACHE_DIR, f"{user_key}-{etag}.csv")
+
+
+def _report_rows(user_id: str, session_factory):
+    """Yield the report as CSV rows. Uses its own session: the request's session
+    is closed before a streaming body starts."""
+    db = session_factory()
+    try:
+        profile = db.query(Profile).filter(Profile.id == user_id).first()
+        missed = db.query(missed_doses_expr).filter(AdherenceLog.user_id == user_id).scalar()
+
+        yield ["MedGuard Doctor Report"]
+        yield ["Generated", datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")]
+        yield ["Patient", profile.full_name or "", "Age", profile.age or "", "Gender", profile.gender or ""]
+        yield ["Risk level", classify_risk(missed), "Missed doses", missed]
+        yield []
+
+        yield ["Medicines"]
+        yield ["name", "dosage", "antibiotic", "status", "urgent", "times", "added"]
+        medicines = select(Medicine).where(Medicine.user_id == user_id).order_by(Medicine.created_at)
+        for m in db.scalars(medicines.execution_options(yield_per=CURSOR_BATCH)):
+            yield [m.name, m.dosage or "", m.is_antibiotic, m.status, m.urgent,
+                   " ".join(m.times or []), m.created_at.date().isoformat() if m.created_at else ""]
+        yield []
+
+        yield ["Reported symptoms"]
+        yield ["symptom", "reported"]
+        symptoms = select(Symptom.symptom_id, Symptom.reported_at).where(Symptom.user_id == user_id)
+        for symptom_id, reported_at in db.execute(symptoms.order_by(Symptom.reported_at)):
+            yield [symptom_id, reported_at.isoformat() if reported_at else ""]
+        yield []
+
+        yield ["Adherence history"]
+        yield ["date", "all_taken", "total_meds", "taken_meds"]
+        # Column tuples (not ORM objects) from a server-side cursor: constant memory
+        history = (
+            select(AdherenceLog.date, AdherenceLog.all_taken, AdherenceLog.total_meds, AdherenceLog.taken_meds)
+            .where(AdherenceLog.user_id == user_id)
+            .order_by(AdherenceLog.date)
+            .execution_options(yield_per=CURSOR_BATCH)
+        )
+        for row in db.execute(history):
+            yield list(row)
+    finally:
+        db.close()
+
+
+def _stream_and_cache(user_id: str, path: str, session_factory):
+    """Encode rows into CSV chunks, teeing them into the cache file.
+    The file only becomes visible once the whole report was written."""
+    os.makedirs(REPORT_CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=REPORT_CACHE_DIR, suffix=".part")
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    completed = False
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as cache_file:
+            for n, row in enumerate(_report_rows(user_id, session_factory), 1):
+                writer.writerow(row)
+                if n % CHUNK_ROWS == 0:
+                    chunk = buffer.getvalue()
+                    cache_file.write(chunk)
+                    yield chunk
+                    buffer.seek(0)
+                    buffer.truncate()
+            chunk = buffer.getvalue()
+            cache_file.write(chunk)
+            yield chunk
+        # Older reports for this patient are stale now
+        for old in glob.glob(path.rsplit("-", 1)[0] + "-*.csv"):
+            os.remove(old)
+        os.replace(tmp_path, path)
+        completed = True
+    finally:
+        if not completed and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+@router.get("/reports/{user_id}.csv")
+def export_report(user_id: str, request: Request, db: Session = Depends(get_read_db)):
+    profile = db.query(Profile).filter(Profile.id == user_id).first()
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    etag, last_modified = _fingerprint(db, profile)
+    headers = {
+        "ETag": f'"{etag}"',
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": f'attachment; filename="medguard-report-{last_modified:%Y%m%d}.csv"',
+    }
+
+    if f'"{etag}"' in [t.strip(" W/") for t in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    path = _cache_path(user_id, etag)
+    if os.path.exists(path):
+        return FileResponse(path, media_type="text/csv", headers=headers)
+
+    # Same database as the fingerprint above, so the cached file matches its ETag
+    rows = _stream_and_cache(user_id, path, read_session_factory(request))
+    return StreamingResponse(rows, media_type="text/csv", headers=headers)
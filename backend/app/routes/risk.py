@@ -4,43 +4,38 @@ GET /api/risk/{user_id}  →  Calculate risk level from missed doses
 """
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.models import Profile, Medicine, AdherenceLog
+from app.database import get_read_db
+from app.models import Profile, AdherenceLog
 
 router = APIRouter(prefix="/api", tags=["Risk"])
 
+# Doses logged but not taken, summed over the daily adherence summaries
+missed_doses_expr = func.coalesce(func.sum(AdherenceLog.total_meds - AdherenceLog.taken_meds), 0)
+
+
+def classify_risk(missed: int) -> str:
+    # Risk rules
+    if missed == 0:
+        return "Low"
+    elif missed <= 2:
+        return "Medium"
+    return "High"
+
 
 @router.get("/risk/{user_id}")
-def get_risk(user_id: int, db: Session = Depends(get_db)):
+def get_risk(user_id: str, db: Session = Depends(get_read_db)):
     # Verify user exists
     profile = db.query(Profile).filter(Profile.id == user_id).first()
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
 
-    # Get all medicine IDs for this user
-    medicine_ids = [
-        m.id for m in db.query(Medicine).filter(Medicine.user_id == user_id).all()
-    ]
-
-    # Count missed doses (taken = false)
-    missed = (
-        db.query(AdherenceLog)
-        .filter(AdherenceLog.medicine_id.in_(medicine_ids), AdherenceLog.taken == False)
-        .count()
-    ) if medicine_ids else 0
-
-    # Risk rules
-    if missed == 0:
-        risk_level = "Low"
-    elif missed <= 2:
-        risk_level = "Medium"
-    else:
-        risk_level = "High"
+    missed = db.query(missed_doses_expr).filter(AdherenceLog.user_id == user_id).scalar()
 
     return {
         "user_id": user_id,
         "missed_doses": missed,
-        "risk_level": risk_level,
+        "risk_level": classify_risk(missed),
     }
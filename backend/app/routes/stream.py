@@ -0,0 +1,42 @@
+"""
+MedGuard — Stream Router
+GET /api/stream/{user_id}  →  Server-sent events with live medicine/adherence diffs
+"""
+
+import asyncio
+import os
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+
+from app.events import broker
+
+router = APIRouter(prefix="/api", tags=["Stream"])
+
+HEARTBEAT_SECONDS = float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+
+
+async def _event_stream(user_id: str):
+    queue = broker.subscribe(user_id)
+    try:
+        # Tell EventSource how long to wait before reconnecting
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                payload = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                # Comment line keeps proxies from closing an idle connection
+                yield ": ping\n\n"
+                continue
+            yield f"data: {payload}\n\n"
+    finally:
+        broker.unsubscribe(user_id, queue)
+
+
+@router.get("/stream/{user_id}")
+async def stream_updates(user_id: str):
+    return StreamingResponse(
+        _event_stream(user_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -52,6 +52,7 @@ class MedicineResponse(BaseModel):
     id: int
     user_id: str
     name: str
+    generic_name: Optional[str] = None
     dosage: Optional[str]
     is_antibiotic: bool
     status: str
@@ -84,6 +85,16 @@ class AdherenceLogResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class AdherenceTrendPoint(BaseModel):
+    granularity: str  # "day" | "week" | "month"
+    period_start: str  # YYYY-MM-DD
+    days: int  # logged days in the bucket
+    all_taken_days: int
+    total_meds: int
+    taken_meds: int
+    rate: Optional[float]  # taken_meds / total_meds
+
+
 # ── Risk ─────────────────────────────────────────────────
 
 class RiskResponse(BaseModel):
@@ -91,3 +102,102 @@ class RiskResponse(BaseModel):
     total_doses: int
     missed_doses: int
     risk_level: str  # "Low" | "Medium" | "High"
+
+
+# ── Caregiver ────────────────────────────────────────────
+
+class CaregiverOverviewRequest(BaseModel):
+    profile_ids: List[str]
+
+
+class AdherenceSummary(BaseModel):
+    date: str
+    all_taken: bool
+    total_meds: int
+    taken_meds: int
+
+
+class PatientOverview(BaseModel):
+    user_id: str
+    full_name: Optional[str]
+    is_senior: bool
+    pending: int
+    taken: int
+    skipped: int
+    latest_adherence: Optional[AdherenceSummary]
+    missed_doses: int
+    risk_level: str  # "Low" | "Medium" | "High"
+
+
+# ── Symptoms / Brain Log ────────────────────────────────
+
+class SymptomCreate(BaseModel):
+    user_id: str
+    symptom_id: str  # e.g. 'rash', 'gastritis', 'fever_pers'
+    reported_at: Optional[datetime] = None
+
+
+class SymptomResponse(BaseModel):
+    id: int
+    user_id: str
+    symptom_id: str
+    reported_at: Optional[datetime]
+
+    model_config = {"from_attributes": True}
+
+
+class BrainLogCreate(BaseModel):
+    user_id: str
+    type: str  # "alert" | "decision" | "insight"
+    level: str = "green"  # "red" | "yellow" | "green"
+    title: Optional[str] = None
+    message: Optional[str] = None
+    data: dict = {}
+    created_at: Optional[datetime] = None
+
+
+class BrainLogResponse(BaseModel):
+    id: int
+    user_id: str
+    type: str
+    level: Optional[str]
+    title: Optional[str]
+    message: Optional[str]
+    data: Any
+    created_at: Optional[datetime]
+
+    model_config = {"from_attributes": True}
+
+
+class QueuedResponse(BaseModel):
+    queued: int
+
+
+# ── Drugs ────────────────────────────────────────────────
+
+class DrugMatch(BaseModel):
+    name: str  # canonical generic
+    is_antibiotic: bool
+    matched: str  # dictionary term (generic or brand) that matched
+    score: float  # 1.0 = exact / prefix
+
+
+# ── OpenFDA ──────────────────────────────────────────────
+
+class FdaLabelResponse(BaseModel):
+    generic_name: str
+    brand_names: Optional[str]  # "|"-separated
+    drug_interactions: Optional[str]
+    fetched_at: float  # unix time the label was snapshotted
+
+
+class FdaInteractionRequest(BaseModel):
+    names: List[str]
+
+
+class FdaInteraction(BaseModel):
+    a: int  # index into the request's names
+    b: int
+    drug_a: str
+    drug_b: str
+
@@ -0,0 +1,169 @@
+"""
+MedGuard — Static SPA serving
+Serves the Vite build with precompressed (.br / .gz) variants, immutable cache
+headers for hashed assets, and an in-memory index.html with ETag support.
+"""
+
+import gzip
+import hashlib
+import os
+import re
+from mimetypes import guess_type
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, Response
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.staticfiles import NotModifiedResponse
+
+try:
+    import brotli  # optional — only used to precompress index.html in memory
+except ImportError:  # pragma: no cover
+    brotli = None
+
+# Vite emits hashed file names such as index-4f3a9c1b.js / logo-BqW9x_2z.svg
+HASHED_ASSET = re.compile(r"-[A-Za-z0-9_-]{8}\.[a-z0-9]+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Preferred order when the client accepts several encodings
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def accepted_encodings(headers: Headers) -> set[str]:
+    """Parse Accept-Encoding, ignoring codings explicitly disabled with q=0."""
+    accepted = set()
+    for part in headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that prefers foo.js.br / foo.js.gz siblings when the client accepts them.
+
+    Variants are produced at build time by precompress_assets.py; nothing is
+    compressed per request. Which variants exist is cached per file, since a
+    build directory never changes while the server runs.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._variants: dict[str, list[tuple[str, str, os.stat_result]]] = {}
+
+    def _find_variants(self, full_path: str):
+        variants = self._variants.get(full_path)
+        if variants is None:
+            variants = []
+            for encoding, suffix in ENCODINGS:
+                try:
+                    variants.append((encoding, full_path + suffix, os.stat(full_path + suffix)))
+                except OSError:
+                    continue
+            self._variants[full_path] = variants
+        return variants
+
+    def file_response(self, full_path, stat_result, scope, status_code=200) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = os.fspath(full_path)
+        headers = {
+            "Cache-Control": IMMUTABLE if HASHED_ASSET.search(os.path.basename(full_path)) else REVALIDATE,
+            "Vary": "Accept-Encoding",
+        }
+        media_type = guess_type(full_path)[0] or "text/plain"
+
+        accepted = accepted_encodings(request_headers)
+        for encoding, variant_path, variant_stat in self._find_variants(full_path):
+            if encoding in accepted:
+                response = FileResponse(
+                    variant_path,
+                    status_code=status_code,
+                    stat_result=variant_stat,
+                    media_type=media_type,
+                    headers={**headers, "Content-Encoding": encoding},
+                )
+                break
+        else:
+            response = FileResponse(
+                full_path, status_code=status_code, stat_result=stat_result,
+                media_type=media_type, headers=headers,
+            )
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+class SpaIndex:
+    """index.html held in memory (plain + compressed), each with its own strong ETag."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            body = f.read()
+        digest = hashlib.sha1(body).hexdigest()
+        self.bodies = {"identity": body, "gzip": gzip.compress(body, compresslevel=9)}
+        if brotli is not None:
+            self.bodies["br"] = brotli.compress(body)
+        # A strong validator must differ per content-coding, or a cache could
+        # answer 304 for a representation in the wrong encoding
+        self.etags = {
+            encoding: f'"{digest}"' if encoding == "identity" else f'"{digest}-{encoding}"'
+            for encoding in self.bodies
+        }
+
+    def _encoding(self, request: Request) -> str:
+        accepted = accepted_encodings(request.headers)
+        for encoding in ("br", "gzip"):
+            if encoding in accepted and encoding in self.bodies:
+                return encoding
+        return "identity"
+
+    def response(self, request: Request) -> Response:
+        encoding = self._encoding(request)
+        headers = {"ETag": self.etags[encoding], "Cache-Control": REVALIDATE, "Vary": "Accept-Encoding"}
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+
+        if_none_match = request.headers.get("if-none-match", "")
+        if self.etags[encoding] in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+            headers.pop("Content-Encoding", None)
+            return Response(status_code=304, headers=headers)
+
+        return Response(self.bodies[encoding], media_type="text/html", headers=headers)
+
+
+def mount_frontend(app: FastAPI, frontend_dist: str):
+    """Serve the built React app: /assets, top-level public files and the SPA fallback."""
+    app.mount("/assets", PrecompressedStaticFiles(directory=os.path.join(frontend_dist, "assets")), name="assets")
+
+    index = SpaIndex(os.path.join(frontend_dist, "index.html"))
+    # Files copied from frontend/public (vite.svg, robots.txt, ...)
+    public_files = {
+        name for name in os.listdir(frontend_dist)
+        if os.path.isfile(os.path.join(frontend_dist, name))
+        and name != "index.html" and not name.endswith((".gz", ".br"))
+    }
+
+    @app.get("/", include_in_schema=False)
+    async def serve_spa_root(request: Request):
+        return index.response(request)
+
+    # Catch-all for React Router (SPA)
+    @app.get("/{full_path:path}", include_in_schema=False)
+    async def serve_react_app(full_path: str, request: Request):
+        # API requests strictly separate — a real 404 so CDNs don't cache it as content
+        if full_path.startswith("api/"):
+            raise HTTPException(status_code=404, detail="API route not found")
+
+        if full_path in public_files:
+            return FileResponse(
+                os.path.join(frontend_dist, full_path),
+                headers={"Cache-Control": REVALIDATE},
+            )
+
+        # Serve index.html for any other path
+        return index.response(request)
@@ -0,0 +1,74 @@
+"""
+MedGuard — Drug index benchmark
+Builds a synthetic dictionary (default 100k names, on top of the bundled
+one) and times exact resolve, misspelled resolve and autocomplete.
+
+Usage:  python bench_drug_index.py [--entries 100000] [--queries 2000]
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from app.drugs import DEFAULT_DICTIONARY, DrugIndex, load_dictionary
+
+CONSONANTS = "bcdfghklmnprstvxz"
+VOWELS = "aeiou"
+# Real drug names share stems heavily, which is what makes trigram postings long
+STEMS = ["cillin", "mycin", "floxacin", "pril", "sartan", "olol", "statin", "prazole",
+         "dipine", "tidine", "vir", "mab", "azole", "cycline", "profen", "gliptin", "semide", "parin"]
+
+
+def synthetic_entries(n, rng):
+    seen = set()
+    while len(seen) < n:
+        head = "".join(rng.choice(CONSONANTS) + rng.choice(VOWELS) for _ in range(rng.randint(1, 3)))
+        name = head + rng.choice(STEMS)
+        if name not in seen:
+            seen.add(name)
+            yield name, rng.random() < 0.1, []
+
+
+def misspell(name, rng):
+    i = rng.randrange(1, len(name) - 1)
+    return name[:i] + name[i + 1:]  # drop one character
+
+
+def timed(fn, queries):
+    timings = []
+    for q in queries:
+        t0 = time.perf_counter()
+        fn(q)
+        timings.append(time.perf_counter() - t0)
+    timings.sort()
+    return statistics.median(timings) * 1e6, timings[int(len(timings) * 0.99) - 1] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    base = load_dictionary(DEFAULT_DICTIONARY)
+    entries = [(d.name, d.is_antibiotic, []) for d in base.drugs] + list(synthetic_entries(args.entries, rng))
+
+    t0 = time.perf_counter()
+    index = DrugIndex(entries)
+    print(f"built index of {len(index)} terms in {time.perf_counter() - t0:.2f} s")
+
+    names = [rng.choice(index.terms) for _ in range(args.queries)]
+    for label, fn, queries in [
+        ("resolve exact", index.resolve, names),
+        ("resolve misspelled", lambda n: index.resolve(n, fuzzy=True), [misspell(n, rng) for n in names]),
+        ("suggest 3-char prefix", index.suggest, [n[:3] for n in names]),
+        ("suggest misspelled", index.suggest, [misspell(n, rng) for n in names]),
+    ]:
+        median, p99 = timed(fn, queries)
+        print(f"{label:24s} median {median:8.1f} µs   p99 {p99:8.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
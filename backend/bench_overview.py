@@ -0,0 +1,87 @@
+"""
+MedGuard — Caregiver overview benchmark
+Seeds N bench-* patients (medicines, a year of adherence logs and their
+rollups) into the configured DATABASE_URL, times POST /api/caregiver/overview,
+then removes the seeded rows. Point DATABASE_URL at a scratch database.
+
+Usage:  python bench_overview.py [--patients 500] [--days 365] [--runs 20]
+"""
+
+import argparse
+import statistics
+import time
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+
+from app.database import SessionLocal, init_db
+from app.main import app
+from app.models import Profile, Medicine, AdherenceLog, AdherenceRollup
+from app.rollups import rebuild_rollups
+
+
+def seed(db, ids, days):
+    today = date.today()
+    db.add_all(Profile(id=pid, full_name=pid, age=70, is_senior=True) for pid in ids)
+    db.flush()
+    for i, pid in enumerate(ids):
+        db.add_all(
+            Medicine(user_id=pid, name=f"Med {n}", status=("pending", "taken", "skipped")[(i + n) % 3])
+            for n in range(5)
+        )
+        db.add_all(
+            AdherenceLog(
+                user_id=pid,
+                date=(today - timedelta(days=d)).isoformat(),
+                all_taken=(i + d) % 7 != 0,
+                total_meds=5,
+                taken_meds=5 if (i + d) % 7 else 3,
+            )
+            for d in range(days)
+        )
+    db.commit()
+    for pid in ids:
+        rebuild_rollups(db, pid)
+
+
+def cleanup(db, ids):
+    db.execute(delete(AdherenceRollup).where(AdherenceRollup.user_id.in_(ids)))
+    db.execute(delete(AdherenceLog).where(AdherenceLog.user_id.in_(ids)))
+    db.execute(delete(Medicine).where(Medicine.user_id.in_(ids)))
+    db.execute(delete(Profile).where(Profile.id.in_(ids)))
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--patients", type=int, default=500)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    init_db()
+    ids = [f"bench-{i:05d}" for i in range(args.patients)]
+    db = SessionLocal()
+    try:
+        print(f"Seeding {args.patients} patients × {args.days} days...")
+        seed(db, ids, args.days)
+
+        client = TestClient(app)
+        timings = []
+        for _ in range(args.runs):
+            t0 = time.perf_counter()
+            response = client.post("/api/caregiver/overview", json={"profile_ids": ids})
+            timings.append(time.perf_counter() - t0)
+            response.raise_for_status()
+
+        print(f"patients returned  {len(response.json())}")
+        print(f"median             {statistics.median(timings) * 1000:.1f} ms")
+        print(f"p95                {sorted(timings)[int(len(timings) * 0.95) - 1] * 1000:.1f} ms")
+    finally:
+        cleanup(db, ids)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+MedGuard — Startup benchmark
+Measures cold import time of app.main and time to first request, each in a
+fresh interpreter so module caches don't hide the real cold-start cost.
+
+Usage:  python bench_startup.py [--runs 5]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+IMPORT_SNIPPET = """
+import json, time
+t0 = time.perf_counter()
+import app.main
+print(json.dumps({"import_s": time.perf_counter() - t0}))
+"""
+
+FIRST_REQUEST_SNIPPET = """
+import json, time
+t0 = time.perf_counter()
+from fastapi.testclient import TestClient
+import app.main
+with TestClient(app.main.app) as client:
+    t_started = time.perf_counter()
+    status = client.get("/api/health").status_code
+    t_first = time.perf_counter()
+    ready = client.get("/api/ready").status_code
+    t_ready = time.perf_counter()
+print(json.dumps({
+    "first_request_s": t_first - t0,
+    "first_request_only_s": t_first - t_started,
+    "ready_s": t_ready - t_first,
+    "health_status": status,
+    "ready_status": ready,
+}))
+"""
+
+
+def run_snippet(snippet):
+    out = subprocess.run([sys.executable, "-c", snippet], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    imports = [run_snippet(IMPORT_SNIPPET)["import_s"] for _ in range(args.runs)]
+    firsts = [run_snippet(FIRST_REQUEST_SNIPPET) for _ in range(args.runs)]
+
+    print(f"import app.main        median {statistics.median(imports) * 1000:8.1f} ms")
+    print(f"time to first request  median {statistics.median(f['first_request_s'] for f in firsts) * 1000:8.1f} ms")
+    print(f"  /api/health itself   median {statistics.median(f['first_request_only_s'] for f in firsts) * 1000:8.1f} ms")
+    print(f"/api/ready (pool warm) median {statistics.median(f['ready_s'] for f in firsts) * 1000:8.1f} ms"
+          f"  (status {firsts[-1]['ready_status']})")
+
+
+if __name__ == "__main__":
+    main()
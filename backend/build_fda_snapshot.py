@@ -0,0 +1,65 @@
+"""
+MedGuard — Build the local OpenFDA label snapshot
+Reads openFDA drug label bulk files (drug-label-*.json or .json.zip from
+https://open.fda.gov/data/downloads/) and writes the SQLite snapshot the
+backend serves interaction checks from. Small JSON fixtures in the same
+{"results": [...]} shape work too, for offline testing.
+
+Usage:  python build_fda_snapshot.py drug-label-0001-of-0013.json.zip [...] [--out data/openfda.sqlite]
+"""
+
+import argparse
+import json
+import time
+import zipfile
+
+from app.fda import DEFAULT_SNAPSHOT, LabelStore, label_row
+
+BATCH = 1000
+
+
+def iter_labels(path):
+    if path.endswith(".zip"):
+        with zipfile.ZipFile(path) as archive:
+            for member in archive.namelist():
+                if member.endswith(".json"):
+                    with archive.open(member) as f:
+                        yield from json.load(f).get("results", [])
+    else:
+        with open(path, encoding="utf-8") as f:
+            yield from json.load(f).get("results", [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--out", default=DEFAULT_SNAPSHOT)
+    args = parser.parse_args()
+
+    store = LabelStore(args.out)
+    start = time.perf_counter()
+    total = 0
+    batch = {}
+    for path in args.files:
+        for label in iter_labels(path):
+            # One row per generic name; a label listing several generics is stored under each
+            for generic in (label.get("openfda") or {}).get("generic_name") or []:
+                row = label_row(generic, label)
+                # Prefer labels that actually carry an interactions section
+                # (upsert also keeps existing text over an empty one)
+                if row["drug_interactions"] or row["generic_name"] not in batch:
+                    batch[row["generic_name"]] = row
+            if len(batch) >= BATCH:
+                store.upsert(list(batch.values()))
+                total += len(batch)
+                batch.clear()
+        print(f"{path}: {total} labels so far")
+    if batch:
+        store.upsert(list(batch.values()))
+        total += len(batch)
+    store.close()
+    print(f"Wrote {total} labels to {args.out} in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
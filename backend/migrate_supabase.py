@@ -0,0 +1,321 @@
+"""
+MedGuard — Bulk migration between the Supabase schema and the backend tables
+Moves adherence_log, symptoms and brain_log in either direction:
+
+  to-backend   Supabase (UUID ids, DATE / TIMESTAMPTZ / JSONB) → backend (string ids, YYYY-MM-DD strings)
+  to-supabase  backend → Supabase
+
+Each table is split into chunks of roughly equal size (ntile over the source
+id). Workers stream a chunk with COPY ... TO STDOUT straight into COPY ...
+FROM STDIN on the target, into a temporary text table; a single INSERT ...
+SELECT then converts the types and skips rows the target already has (by
+natural key), all in one transaction per chunk. Finished chunks are recorded
+in a JSON checkpoint, so an interrupted run resumes where it stopped and a
+chunk is never applied twice.
+
+to-backend creates stub profiles for unknown users. to-supabase skips rows
+whose user has no auth.users entry (rows cannot be attached to a user that
+does not exist there). Connect to Supabase with the direct (non-pooled)
+connection string of a role that bypasses RLS, e.g. postgres.
+
+Usage:  python migrate_supabase.py to-backend  --supabase-url postgresql://... [--workers 4] [--chunks 64]
+        python migrate_supabase.py to-supabase --supabase-url postgresql://... [--tables adherence_log]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import psycopg
+from dotenv import load_dotenv
+from psycopg import sql
+
+from sqlalchemy import create_engine
+
+# Same .env as the app, so DATABASE_URL / SUPABASE_DB_URL defaults work
+load_dotenv(os.path.join(os.path.dirname(__file__), ".env"))
+
+DEFAULT_CHECKPOINT = "migrate_checkpoint.json"
+# Column types on each side; "text" columns are copied as is
+COLUMN_TYPES = {
+    "backend": {"text": "text", "id": "text", "date": "text", "bool": "boolean", "int": "integer",
+                "ts": "timestamp", "json": "json"},
+    "supabase": {"text": "text", "id": "uuid", "date": "date", "bool": "boolean", "int": "integer",
+                 "ts": "timestamptz", "json": "jsonb"},
+}
+# (backend column, supabase column, kind)
+TABLES = {
+    "adherence_log": {
+        "columns": [("user_id", "user_id", "id"), ("date", "date", "date"), ("all_taken", "all_taken", "bool"),
+                    ("total_meds", "total_meds", "int"), ("taken_meds", "taken_meds", "int"),
+                    ("updated_at", "created_at", "ts")],
+        "key": ["user_id", "date"],
+    },
+    "symptoms": {
+        "columns": [("user_id", "user_id", "id"), ("symptom_id", "symptom_id", "text"),
+                    ("reported_at", "reported_at", "ts")],
+        "key": ["user_id", "symptom_id"],
+    },
+    "brain_log": {
+        "columns": [("user_id", "user_id", "id"), ("type", "type", "text"), ("level", "level", "text"),
+                    ("title", "title", "text"), ("message", "message", "text"), ("data", "data", "json"),
+                    ("created_at", "created_at", "ts")],
+        "key": ["user_id", "created_at", "type"],
+    },
+}
+UUID_PATTERN = "^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"
+
+
+def connect(url: str) -> psycopg.Connection:
+    conn = psycopg.connect(url.replace("postgresql+psycopg://", "postgresql://", 1))
+    # Text COPY output must not depend on server settings
+    conn.execute("SET TIME ZONE 'UTC'")
+    conn.execute("SET DateStyle = 'ISO, YMD'")
+    conn.commit()
+    return conn
+
+
+def cast(expr: sql.Composable, kind: str, side: str) -> sql.Composable:
+    """Convert a staged text value into the target side's column type."""
+    target = COLUMN_TYPES[side][kind]
+    if target == "text":
+        return expr
+    if target == "timestamp":  # backend stores naive UTC
+        return sql.SQL("({}::timestamptz AT TIME ZONE 'UTC')").format(expr)
+    if target == "timestamptz":
+        return sql.SQL("({}::timestamp AT TIME ZONE 'UTC')").format(expr)
+    return sql.SQL("{}::{}").format(expr, sql.SQL(target))
+
+
+class Plan:
+    def __init__(self, direction: str, table: str):
+        spec = TABLES[table]
+        self.table = table
+        self.to_backend = direction == "to-backend"
+        self.target_side = "backend" if self.to_backend else "supabase"
+        self.source_id_type = "uuid" if self.to_backend else "integer"
+        # (target column, source column, kind) in copy order
+        pairs = [(b, s, k) if self.to_backend else (s, b, k) for b, s, k in spec["columns"]]
+        self.source_cols = [src for _, src, _ in pairs]
+        self.target_cols = [dst for dst, _, _ in pairs]
+        self.kinds = {dst: kind for dst, _, kind in pairs}
+        to_target = {b: (b if self.to_backend else s) for b, s, _ in spec["columns"]}
+        self.key = [to_target[k] for k in spec["key"]]
+
+    def copy_out(self, lower, upper) -> sql.Composed:
+        conditions = []
+        if lower is not None:
+            conditions.append(sql.SQL("id >= {}::{}").format(sql.Literal(lower), sql.SQL(self.source_id_type)))
+        if upper is not None:
+            conditions.append(sql.SQL("id < {}::{}").format(sql.Literal(upper), sql.SQL(self.source_id_type)))
+        where = sql.SQL(" WHERE ") + sql.SQL(" AND ").join(conditions) if conditions else sql.SQL("")
+        return sql.SQL("COPY (SELECT {} FROM {}{}) TO STDOUT").format(
+            sql.SQL(", ").join(map(sql.Identifier, self.source_cols)), sql.Identifier(self.table), where)
+
+    def create_staging(self) -> sql.Composed:
+        return sql.SQL("CREATE TEMP TABLE staging ({}) ON COMMIT DROP").format(
+            sql.SQL(", ").join(sql.SQL("{} text").format(sql.Identifier(c)) for c in self.target_cols))
+
+    def copy_in(self) -> sql.Composed:
+        return sql.SQL("COPY staging ({}) FROM STDIN").format(
+            sql.SQL(", ").join(map(sql.Identifier, self.target_cols)))
+
+    def _value(self, col: str, alias: str = "s") -> sql.Composable:
+        return cast(sql.Identifier(alias, col), self.kinds[col], self.target_side)
+
+    def stub_profiles(self) -> sql.Composed:
+        # Sorted, so concurrent chunks take profile row locks in the same order
+        return sql.SQL(
+            "INSERT INTO profiles (id, is_senior, created_at) "
+            "SELECT DISTINCT s.user_id, false, (now() AT TIME ZONE 'UTC') FROM staging s "
+            "WHERE s.user_id IS NOT NULL ORDER BY s.user_id ON CONFLICT (id) DO NOTHING"
+        )
+
+    def drop_foreign_users(self) -> sql.Composed:
+        # Backend ids are free-form strings; only UUIDs can belong to auth.users.
+        # Done up front because WHERE clauses don't guarantee evaluation order for the ::uuid casts
+        return sql.SQL("DELETE FROM staging WHERE user_id IS NULL OR user_id !~ {}").format(sql.Literal(UUID_PATTERN))
+
+    def insert(self) -> sql.Composed:
+        filters = [
+            sql.SQL("NOT EXISTS (SELECT 1 FROM {} t WHERE {})").format(
+                sql.Identifier(self.table),
+                sql.SQL(" AND ").join(
+                    sql.SQL("t.{} = {}").format(sql.Identifier(k), self._value(k)) for k in self.key
+                ),
+            )
+        ]
+        if not self.to_backend:
+            filters.append(sql.SQL("EXISTS (SELECT 1 FROM auth.users u WHERE u.id = s.user_id::uuid)"))
+        return sql.SQL("INSERT INTO {} ({}) SELECT {} FROM staging s WHERE {} ON CONFLICT DO NOTHING").format(
+            sql.Identifier(self.table),
+            sql.SQL(", ").join(map(sql.Identifier, self.target_cols)),
+            sql.SQL(", ").join(self._value(c) for c in self.target_cols),
+            sql.SQL(" AND ").join(filters),
+        )
+
+
+def chunk_bounds(conn: psycopg.Connection, table: str, chunks: int) -> list[dict]:
+    """Lower id bound and row count of each ntile bucket, in id order."""
+    rows = conn.execute(
+        sql.SQL(
+            "SELECT min(id)::text, count(*) FROM "
+            "(SELECT id, ntile({}) OVER (ORDER BY id) AS bucket FROM {}) b "
+            "GROUP BY bucket ORDER BY bucket"
+        ).format(sql.Literal(chunks), sql.Identifier(table))
+    ).fetchall()
+    conn.commit()
+    return [{"lower": lower, "rows": count} for lower, count in rows]
+
+
+class Checkpoint:
+    def __init__(self, path: str, direction: str, fresh: bool):
+        self.path = path
+        self.lock = threading.Lock()
+        self.state = {"direction": direction, "tables": {}}
+        if os.path.exists(path) and not fresh:
+            with open(path, encoding="utf-8") as f:
+                self.state = json.load(f)
+            if self.state.get("direction") != direction:
+                sys.exit(f"{path} is a {self.state.get('direction')} checkpoint; use --fresh or another --checkpoint")
+
+    def table(self, name: str) -> dict | None:
+        return self.state["tables"].get(name)
+
+    def plan_table(self, name: str, bounds: list[dict]):
+        with self.lock:
+            self.state["tables"][name] = {"chunks": bounds, "done": {}}
+            self._save()
+
+    def finish_chunk(self, name: str, index: int, copied: int, inserted: int):
+        with self.lock:
+            self.state["tables"][name]["done"][str(index)] = {"copied": copied, "inserted": inserted}
+            self._save()
+
+    def _save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=1)
+        os.replace(tmp, self.path)
+
+
+def migrate_chunk(plan: Plan, source_url: str, target_url: str, lower, upper) -> tuple[int, int]:
+    """Copy one id range; returns (rows copied, rows inserted). Commits once, at the end."""
+    with connect(source_url) as src, connect(target_url) as dst:
+        with src.cursor() as read, dst.cursor() as write:
+            write.execute(plan.create_staging())
+            with read.copy(plan.copy_out(lower, upper)) as out, write.copy(plan.copy_in()) as into:
+                for block in out:
+                    into.write(block)
+            copied = write.execute("SELECT count(*) FROM staging").fetchone()[0]
+            if plan.to_backend:
+                write.execute(plan.stub_profiles())
+            else:
+                write.execute(plan.drop_foreign_users())
+            write.execute(plan.insert())
+            inserted = write.rowcount
+        dst.commit()
+    return copied, inserted
+
+
+def migrate_table(name: str, args, checkpoint: Checkpoint, source_url: str, target_url: str):
+    plan = Plan(args.direction, name)
+    state = checkpoint.table(name)
+    if state is None:
+        with connect(source_url) as conn:
+            bounds = chunk_bounds(conn, name, args.chunks)
+        checkpoint.plan_table(name, bounds)
+        state = checkpoint.table(name)
+
+    chunks = state["chunks"]
+    total = sum(c["rows"] for c in chunks)
+    done_rows = sum(chunks[int(i)]["rows"] for i in state["done"])
+    pending = [i for i in range(len(chunks)) if str(i) not in state["done"]]
+    print(f"[{name}] {total:,} rows in {len(chunks)} chunks, {len(pending)} to go")
+    if not pending:
+        return True
+
+    start = time.perf_counter()
+    moved = 0
+    failed = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {}
+        for i in pending:
+            # First chunk has no lower bound, last no upper bound: rows added since planning are kept
+            lower = chunks[i]["lower"] if i > 0 else None
+            upper = chunks[i + 1]["lower"] if i + 1 < len(chunks) else None
+            futures[pool.submit(migrate_chunk, plan, source_url, target_url, lower, upper)] = i
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                copied, inserted = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"[{name}] chunk {i + 1}/{len(chunks)} failed: {e}")
+                continue
+            checkpoint.finish_chunk(name, i, copied, inserted)
+            moved += copied
+            done_rows += chunks[i]["rows"]
+            elapsed = time.perf_counter() - start
+            print(
+                f"[{name}] chunk {i + 1}/{len(chunks)}: {copied:,} copied, {inserted:,} inserted "
+                f"— {done_rows:,}/{total:,} rows ({done_rows / max(total, 1):.0%}), "
+                f"{moved / max(elapsed, 1e-9):,.0f} rows/s"
+            )
+    return failed == 0
+
+
+def create_backend_tables(backend_url: str):
+    """Backend tables may not exist yet on a fresh database."""
+    # app.database refuses to import without DATABASE_URL; --backend-url is enough here
+    os.environ.setdefault("DATABASE_URL", backend_url)
+    from app.database import Base
+    from app import models  # noqa: F401  (registers the tables on Base)
+
+    backend = create_engine("postgresql+psycopg://" + backend_url.split("://", 1)[1])
+    Base.metadata.create_all(bind=backend)
+    backend.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("direction", choices=["to-backend", "to-supabase"])
+    parser.add_argument("--supabase-url", default=os.getenv("SUPABASE_DB_URL"),
+                        help="Supabase Postgres connection string (default: $SUPABASE_DB_URL)")
+    parser.add_argument("--backend-url", default=os.getenv("DATABASE_URL"),
+                        help="backend database (default: $DATABASE_URL)")
+    parser.add_argument("--tables", nargs="+", choices=list(TABLES), default=list(TABLES))
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunks", type=int, default=64, help="chunks per table (only used when planning)")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--fresh", action="store_true", help="ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    if not args.supabase_url or not args.backend_url:
+        sys.exit("Both --supabase-url (or SUPABASE_DB_URL) and --backend-url (or DATABASE_URL) are required")
+
+    if args.direction == "to-backend":
+        source_url, target_url = args.supabase_url, args.backend_url
+        create_backend_tables(args.backend_url)
+    else:
+        source_url, target_url = args.backend_url, args.supabase_url
+
+    checkpoint = Checkpoint(args.checkpoint, args.direction, args.fresh)
+    start = time.perf_counter()
+    ok = True
+    for name in args.tables:
+        ok = migrate_table(name, args, checkpoint, source_url, target_url) and ok
+    print(f"Finished in {time.perf_counter() - start:.1f}s")
+
+    if args.direction == "to-backend" and "adherence_log" in args.tables:
+        print("Run rebuild_rollups.py to refresh the weekly / monthly adherence rollups.")
+    if not ok:
+        sys.exit("Some chunks failed — re-run the same command to retry them.")
+
+
+if __name__ == "__main__":
+    main()
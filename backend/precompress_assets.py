@@ -0,0 +1,61 @@
+"""
+MedGuard — Precompress the frontend build
+Writes .gz (and .br, if the `brotli` package is installed) next to every
+compressible file in frontend/dist so the backend can serve them without
+compressing per request. Run after `npm run build`.
+
+Usage:  python precompress_assets.py [path/to/dist]
+"""
+
+import gzip
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = (".js", ".css", ".html", ".svg", ".json", ".txt", ".map", ".xml", ".webmanifest")
+MIN_SIZE = 1024  # smaller files aren't worth a second request-path lookup
+
+DEFAULT_DIST = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "frontend", "dist")
+
+
+def precompress(dist):
+    written = 0
+    saved = 0
+    for root, _, files in os.walk(dist):
+        for name in files:
+            if not name.endswith(COMPRESSIBLE):
+                continue
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                data = f.read()
+            if len(data) < MIN_SIZE:
+                continue
+
+            variants = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+            if brotli is not None:
+                variants.append((".br", brotli.compress(data, quality=11)))
+
+            for suffix, compressed in variants:
+                # Only keep variants that actually help
+                if len(compressed) >= len(data):
+                    continue
+                with open(path + suffix, "wb") as f:
+                    f.write(compressed)
+                written += 1
+                saved += len(data) - len(compressed)
+
+    print(f"Wrote {written} compressed variants, {saved / 1024:.1f} KiB saved per full download.")
+    if brotli is None:
+        print("Tip: pip install brotli to also generate .br variants.")
+
+
+if __name__ == "__main__":
+    dist = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DIST
+    if not os.path.isdir(dist):
+        print(f"Build directory not found: {dist}")
+        sys.exit(1)
+    precompress(dist)
@@ -0,0 +1,20 @@
+from app.database import SessionLocal, init_db
+from app.rollups import rebuild_rollups
+import sys
+
+def main():
+    # Optional user id: rebuild one patient only
+    user_id = sys.argv[1] if len(sys.argv) > 1 else None
+    init_db()
+    db = SessionLocal()
+    try:
+        print(f"Rebuilding adherence rollups for {user_id or 'all users'}...")
+        count = rebuild_rollups(db, user_id)
+        print(f"Wrote {count} rollup rows.")
+    except Exception as e:
+        print(f"Error rebuilding rollups: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from app.database import SessionLocal, engine, Base
-from app.models import Profile, Medicine, AdherenceLog
+from app import models  # noqa: F401 — registers every table on Base.metadata
 from sqlalchemy import text
 import sys
 
@@ -9,6 +9,10 @@ def reset_db():
         # Drop via SQL to handle cascade
         # Use simple session
         with engine.connect() as conn:
+            conn.execute(text("DROP TABLE IF EXISTS schema_migrations CASCADE"))
+            conn.execute(text("DROP TABLE IF EXISTS brain_log CASCADE"))
+            conn.execute(text("DROP TABLE IF EXISTS symptoms CASCADE"))
+            conn.execute(text("DROP TABLE IF EXISTS adherence_rollup CASCADE"))
             conn.execute(text("DROP TABLE IF EXISTS adherence_log CASCADE"))
             conn.execute(text("DROP TABLE IF EXISTS medicines CASCADE"))
             conn.execute(text("DROP TABLE IF EXISTS profiles CASCADE"))
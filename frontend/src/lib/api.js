@@ -12,8 +12,20 @@ async function request(endpoint, options = {}) {
         ...options.headers,
     };
 
+    // credentials: the backend sets a short-lived cookie after writes so that
+    // our next reads skip the (possibly lagging) read replica
+    const init = { credentials: 'include', ...options, headers };
+
     try {
-        const response = await fetch(url, { ...options, headers });
+        let response;
+        try {
+            response = await fetch(url, init);
+        } catch (networkError) {
+            // Writes carrying an Idempotency-Key are safe to resend once: if the
+            // first attempt did reach the server, its stored response comes back
+            if (!headers['Idempotency-Key']) throw networkError;
+            response = await fetch(url, init);
+        }
 
         if (!response.ok) {
             const errorData = await response.json().catch(() => ({}));
@@ -27,12 +39,19 @@ async function request(endpoint, options = {}) {
     }
 }
 
+// Idempotency-Key for non-idempotent writes: a retry carrying the same key is
+// answered from the server's stored response instead of running twice.
+function idempotencyHeaders() {
+    return { 'Idempotency-Key': crypto.randomUUID() };
+}
+
 export const api = {
     // ── Profile ─────────────────────────────────────────────
     getProfile: (userId) => request(`/profiles/${userId}`),
 
     createOrUpdateProfile: (profileData) => request(`/profile`, {
         method: 'POST',
+        headers: idempotencyHeaders(),
         body: JSON.stringify(profileData),
     }),
 
@@ -43,6 +62,26 @@ export const api = {
 
         const response = await fetch(`${API_BASE_URL}/prescriptions/upload`, {
             method: 'POST',
+            credentials: 'include',
+            headers: idempotencyHeaders(),
+            body: formData,
+        });
+
+        if (!response.ok) {
+            const error = await response.json().catch(() => ({}));
+            throw new Error(error.detail || 'Analysis failed');
+        }
+        return await response.json();
+    },
+
+    analyzePrescriptionBatch: async (files) => {
+        const formData = new FormData();
+        for (const file of files) formData.append('files', file);
+
+        const response = await fetch(`${API_BASE_URL}/prescriptions/upload/batch`, {
+            method: 'POST',
+            credentials: 'include',
+            headers: idempotencyHeaders(),
             body: formData,
         });
 
@@ -58,6 +97,7 @@ export const api = {
 
     createMedicine: (medicineData) => request(`/medicines`, {
         method: 'POST',
+        headers: idempotencyHeaders(),
         body: JSON.stringify(medicineData),
     }),
 
@@ -75,4 +115,71 @@ export const api = {
         method: 'POST',
         body: JSON.stringify(logData),
     }),
+
+    // granularity is optional: day (≤ 3 months), week (≤ 2 years) or month
+    getAdherenceTrend: (userId, start, end, granularity) => request(
+        `/adherence/trend/${userId}?start=${start}&end=${end}${granularity ? `&granularity=${granularity}` : ''}`
+    ),
+
+    // ── Brain Log / Symptoms (buffered server-side) ─────────
+    logBrainEvents: (events) => request(`/brain_log`, {
+        method: 'POST',
+        body: JSON.stringify(events),
+    }),
+
+    getBrainLog: (userId, limit = 50) => request(`/brain_log/${userId}?limit=${limit}`),
+
+    reportSymptoms: (symptoms) => request(`/symptoms`, {
+        method: 'POST',
+        body: JSON.stringify(symptoms),
+    }),
+
+    getSymptoms: (userId) => request(`/symptoms/${userId}`),
+
+    deleteSymptom: (userId, symptomId) => request(`/symptoms/${userId}/${symptomId}`, {
+        method: 'DELETE',
+    }),
+
+    // ── Doctor Report ───────────────────────────────────────
+    // Streamed CSV download; use as an <a href> so the browser handles caching
+    getReportUrl: (userId) => `${API_BASE_URL}/reports/${userId}.csv`,
+
+    // ── OpenFDA (local snapshot) ────────────────────────────
+    checkFdaInteractions: (names) => request(`/fda/interactions`, {
+        method: 'POST',
+        body: JSON.stringify({ names }),
+    }),
+
+    // ── Live Updates (SSE) ──────────────────────────────────
+    // Calls onEvent with compact diffs: medicine.created / medicine.updated /
+    // medicine.deleted / adherence.logged / resync. Returns an unsubscribe fn.
+    subscribeToUpdates: (userId, onEvent) => {
+        const source = new EventSource(`${API_BASE_URL}/stream/${userId}`);
+        source.onmessage = (e) => {
+            try {
+                onEvent(JSON.parse(e.data));
+            } catch (err) {
+                console.error('[API] Bad stream event:', err);
+            }
+        };
+        return () => source.close();
+    },
 };
+
+/**
+ * Apply a medicine.* stream event to a medicines list (pure, returns a new list).
+ */
+export function applyMedicineEvent(medicines, event) {
+    switch (event?.type) {
+        case 'medicine.created':
+            return medicines.some(m => m.id === event.medicine.id)
+                ? medicines
+                : [...medicines, event.medicine];
+        case 'medicine.updated':
+            return medicines.map(m => m.id === event.id ? { ...m, ...event.changes } : m);
+        case 'medicine.deleted':
+            return medicines.filter(m => m.id !== event.id);
+        default:
+            return medicines;
+    }
+}
@@ -4,12 +4,13 @@
  * ═══════════════════════════════════════════════════════════
  *
  * Client-side drug interaction checking with built-in database
- * of common Indian-market drug pairs + OpenFDA API fallback.
+ * of common Indian-market drug pairs + OpenFDA label data (via backend).
  *
  * Ported from the legacy risk_engine.js backend logic.
  */
 
 import { safeFetch } from './safeAsync';
+import { api } from './api';
 
 // ─── Built-In Interaction Database ──────────────────────
 // Common drug-drug interactions (Indian market focus)
@@ -288,29 +289,25 @@ export async function checkAllInteractions(medicineNames) {
         }
     }
 
-    // 2. OpenFDA fallback for remaining pairs (skipif already found locally)
-    for (let i = 0; i < names.length; i++) {
-        const fdaInteractions = await getOpenFdaInteractions(names[i]);
-        if (!fdaInteractions) continue;
-
-        for (let j = 0; j < names.length; j++) {
-            if (i === j) continue;
-            const key = makeKey(names[i], names[j]);
-            if (checkedPairs.has(key)) continue;
-
-            // Check if other drug is mentioned in this drug's interaction text
-            if (fdaInteractions.toLowerCase().includes(names[j])) {
-                checkedPairs.add(key);
-                flags.push({
-                    level: 'yellow',
-                    type: 'interaction_fda',
-                    drugA: medicineNames[i],
-                    drugB: medicineNames[j],
-                    message: `Potential interaction found between ${medicineNames[i]} and ${medicineNames[j]}. Consult your doctor.`,
-                    advice: 'This was flagged by FDA drug label data. Please verify with your physician.',
-                });
-            }
-        }
+    // 2. FDA label data for remaining pairs — one backend call, answered from
+    //    a local OpenFDA snapshot instead of api.fda.gov per drug
+    //    (an unavailable check is logged, not mistaken for "no interactions")
+    const fdaPairs = await api.checkFdaInteractions(names).catch((err) => {
+        console.warn('[Interactions] FDA label check unavailable, only built-in pairs were checked:', err.message);
+        return [];
+    });
+    for (const { a: i, b: j } of fdaPairs) {
+        const key = makeKey(names[i], names[j]);
+        if (checkedPairs.has(key)) continue;
+        checkedPairs.add(key);
+        flags.push({
+            level: 'yellow',
+            type: 'interaction_fda',
+            drugA: medicineNames[i],
+            drugB: medicineNames[j],
+            message: `Potential interaction found between ${medicineNames[i]} and ${medicineNames[j]}. Consult your doctor.`,
+            advice: 'This was flagged by FDA drug label data. Please verify with your physician.',
+        });
     }
 
     return flags;
@@ -397,17 +394,6 @@ export function getAmrRisk(medicineName, missedDoses = 0) {
 
 // ─── OpenFDA API Helpers ────────────────────────────────
 
-async function getOpenFdaInteractions(drugName) {
-    const { data } = await safeFetch(
-        `https://api.fda.gov/drug/label.json?search=openfda.generic_name:"${encodeURIComponent(drugName)}"&limit=1`,
-        { timeout: 8000, retries: 0, label: 'openfda-label' }
-    );
-
-    if (!data?.results?.[0]) return null;
-    const label = data.results[0];
-    return label.drug_interactions?.[0] || null;
-}
-
 /**
  * Get adverse events from OpenFDA for a drug (supplementary data).
  */
@@ -2,7 +2,7 @@ import React, { useState, useEffect, useRef } from 'react';
 import { Bot, Mic, Check, X, Clock, Pill, Activity, Volume2, VolumeX, User, RefreshCw, Zap, Calendar, Settings, ChevronRight, Flame, Trophy, FileText, PlusCircle, AlertTriangle, Brain, Shield, TrendingUp } from 'lucide-react';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext';
-import { api } from '../lib/api';
+import { api, applyMedicineEvent } from '../lib/api';
 import { safeStorageGet, safeStorageSet } from '../lib/safeAsync';
 import { useBrain } from '../lib/useBrain';
 import SeniorDashboard from './SeniorDashboard';
@@ -138,6 +138,31 @@ export default function Dashboard() {
         fetchData();
     }, [user, navigate]);
 
+    // --- LIVE UPDATES (SSE) ---
+    // Changes from other devices / caregivers arrive as diffs instead of re-fetching.
+    // SeniorDashboard keeps its own subscription, so only subscribe in normal mode.
+    useEffect(() => {
+        if (!user || seniorMode) return;
+        const unsubscribe = api.subscribeToUpdates(user.id, async (event) => {
+            if (event.type === 'resync') {
+                try {
+                    setMedicines(await api.getMedicines(user.id));
+                } catch (e) {
+                    console.error("Failed to resync medicines", e);
+                }
+                return;
+            }
+            setMedicines(prev => applyMedicineEvent(prev, event));
+        });
+        return unsubscribe;
+    }, [user, seniorMode]);
+
+    // Progress follows the list, including changes made elsewhere
+    useEffect(() => {
+        const taken = medicines.filter(m => m?.status === 'taken').length;
+        setProgress(medicines.length > 0 ? Math.round((taken / medicines.length) * 100) : 0);
+    }, [medicines]);
+
 
     // --- ROBUST AUDIO ENGINE ---
     const speak = (text) => {
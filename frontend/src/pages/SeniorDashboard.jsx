@@ -3,7 +3,7 @@ import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { Volume2, CheckCircle, Mic, AlertCircle, Settings, Phone, Calendar } from 'lucide-react';
 import { useAuth } from '../context/AuthContext';
-import { api } from '../lib/api';
+import { api, applyMedicineEvent } from '../lib/api';
 import { safeStorageGet } from '../lib/safeAsync';
 
 export default function SeniorDashboard() {
@@ -38,6 +38,16 @@ export default function SeniorDashboard() {
             }
         }
         loadMeds();
+
+        // Live updates (e.g. a caregiver marking a dose) instead of polling
+        const unsubscribe = api.subscribeToUpdates(user.id, (event) => {
+            if (event.type === 'resync') {
+                loadMeds();
+                return;
+            }
+            setMedicines(prev => applyMedicineEvent(prev, event));
+        });
+        return unsubscribe;
     }, [user]);
 
     // TTS Helper